@@ -1,74 +1,219 @@
+# areadeteste.py
+"""
+areadeteste.py
+Simulador de tabela (alvo de testes da digitação).
+- Foco em O(1): cada Entry sabe a própria (linha, coluna); sem varrer a grade a cada tecla
+- --linhas N: tamanho inicial; com --crescer novas linhas são criadas quando o foco passa da última
+- --down-inicio: DOWN vai para a 1ª coluna da próxima linha (como no sistema real, nova linha de lançamento)
+- --log arquivo.jsonl: registra cada tecla (instante, tecla, linha, coluna)
+- --controle: lê comandos no stdin ("dump" imprime as células em JSON, "limpar", "sair") — usado por benchmarks/e2e.py
+
+Uso: python areadeteste.py [--linhas 25] [--colunas 8] [--crescer] [--down-inicio] [--log teclas.jsonl] [--controle]
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
 import tkinter as tk
 
-root = tk.Tk()
-root.title("Tabela de Teste para Automação")
-root.geometry("1200x900")
+HEADERS = ["Código", "Quantidade", "Lote", "Data", "valor", "un", "PS", "Data/Lote"]
+NAV_KEYS = ("Return", "Down", "Up", "Left", "Right")
 
-# Cabeçalho
-tk.Label(root, text="Simulador de Tabela (para testes de automação)", font=("Arial", 12, "bold")).pack(pady=5)
 
-# Frame principal
-frame = tk.Frame(root)
-frame.pack(pady=10)
+class TabelaTeste:
+    """Grade de Entry com navegação por Enter/setas e registro opcional das teclas."""
+    def __init__(self, root, linhas=25, colunas=8, crescer=False, down_inicio=False, log_path=None):
+        self.root = root
+        self.colunas = colunas
+        self.crescer = crescer
+        self.down_inicio = down_inicio
+        self.entradas = []
+        self.log = open(log_path, "w", encoding="utf-8") if log_path else None
+        if self.log is not None:
+            # tag própria antes da do widget: registra toda tecla, inclusive as de navegação
+            root.bind_class("Registro", "<KeyPress>", self._registrar)
 
-linhas = 25
-colunas = 8
-entradas = []
+        # a grade fica num canvas rolável: com muitas linhas a janela não cresce junto
+        outer = tk.Frame(root)
+        outer.pack(fill="both", expand=True, pady=10)
+        self.canvas = tk.Canvas(outer, highlightthickness=0)
+        vsb = tk.Scrollbar(outer, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=vsb.set)
+        vsb.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.frame = tk.Frame(self.canvas)
+        self.canvas.create_window((0, 0), window=self.frame, anchor="nw")
+        self.frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
 
-# Função para mover o foco com Enter e Setas
-def mover_foco(event):
-    widget = event.widget
-    for i in range(linhas):
         for j in range(colunas):
-            if entradas[i][j] == widget:
-                if event.keysym == "Return":  # Enter
-                    # Move para próxima célula à direita
-                    if j + 1 < colunas:
-                        entradas[i][j + 1].focus()
-                    else:
-                        # Vai pra primeira célula da próxima linha
-                        if i + 1 < linhas:
-                            entradas[i + 1][0].focus()
-                elif event.keysym == "Down":
-                    if i + 1 < linhas:
-                        entradas[i + 1][j].focus()
-                elif event.keysym == "Up":
-                    if i - 1 >= 0:
-                        entradas[i - 1][j].focus()
-                elif event.keysym == "Left":
-                    if j - 1 >= 0:
-                        entradas[i][j - 1].focus()
-                elif event.keysym == "Right":
-                    if j + 1 < colunas:
-                        entradas[i][j + 1].focus()
-                return "break"
-
-# Cabeçalho das colunas
-headers = ["Código", "Quantidade", "Lote", "Data", "valor", "un", "PS", "Data/Lote"]
-for j, nome in enumerate(headers):
-    tk.Label(frame, text=nome, font=("Arial", 10, "bold"), width=15, borderwidth=1, relief="solid").grid(row=0, column=j)
-
-# Cria a tabela de entradas
-for i in range(1, linhas + 1):
-    linha = []
-    for j in range(colunas):
-        e = tk.Entry(frame, width=18, justify="center", font=("Arial", 10))
-        e.grid(row=i, column=j, padx=3, pady=3)
-        e.bind("<Return>", mover_foco)
-        e.bind("<Up>", mover_foco)
-        e.bind("<Down>", mover_foco)
-        e.bind("<Left>", mover_foco)
-        e.bind("<Right>", mover_foco)
-        linha.append(e)
-    entradas.append(linha)
-
-# Botão para limpar tabela
-def limpar():
-    for linha in entradas:
-        for e in linha:
-            e.delete(0, tk.END)
-    entradas[0][0].focus()
-
-tk.Button(root, text="Limpar Tudo", command=limpar, bg="#d9534f", fg="white", width=15).pack(pady=5)
-
-root.mainloop()
+            nome = HEADERS[j] if j < len(HEADERS) else f"Col {j+1}"
+            tk.Label(self.frame, text=nome, font=("Arial", 10, "bold"), width=15,
+                     borderwidth=1, relief="solid").grid(row=0, column=j)
+        for _ in range(linhas):
+            self._nova_linha()
+
+    def _nova_linha(self):
+        i = len(self.entradas)
+        linha = []
+        for j in range(self.colunas):
+            e = tk.Entry(self.frame, width=18, justify="center", font=("Arial", 10))
+            e.grid(row=i + 1, column=j, padx=3, pady=3)
+            e.pos = (i, j)
+            for key in NAV_KEYS:
+                e.bind(f"<{key}>", self.mover_foco)
+            if self.log is not None:
+                e.bindtags(("Registro",) + e.bindtags())
+            linha.append(e)
+        self.entradas.append(linha)
+        return linha
+
+    def _linha(self, i):
+        # linha i, criando as que faltarem se a grade puder crescer; None se não existir
+        while self.crescer and i >= len(self.entradas):
+            self._nova_linha()
+        return self.entradas[i] if 0 <= i < len(self.entradas) else None
+
+    def _focar(self, i, j):
+        linha = self._linha(i)
+        if linha is not None and 0 <= j < self.colunas:
+            linha[j].focus_set()
+            if self.crescer:
+                self.root.after_idle(lambda: self._mostrar(linha[j]))
+
+    def _mostrar(self, entry):
+        # rola o canvas até a célula com foco
+        total = self.frame.winfo_height()
+        if total > 0:
+            y = entry.winfo_y()
+            top, bottom = self.canvas.yview()
+            if not (top * total <= y <= bottom * total - entry.winfo_height()):
+                self.canvas.yview_moveto(max(0.0, (y - 40) / total))
+
+    def mover_foco(self, event):
+        i, j = event.widget.pos
+        key = event.keysym
+        if key == "Return":
+            if j + 1 < self.colunas:
+                self._focar(i, j + 1)
+            else:
+                self._focar(i + 1, 0)
+        elif key == "Down":
+            self._focar(i + 1, 0 if self.down_inicio else j)
+        elif key == "Up":
+            self._focar(i - 1, j)
+        elif key == "Left":
+            self._focar(i, j - 1)
+        elif key == "Right":
+            self._focar(i, j + 1)
+        return "break"
+
+    def _registrar(self, event):
+        i, j = event.widget.pos
+        rec = {"t": round(time.perf_counter(), 6), "key": event.keysym, "char": event.char, "row": i, "col": j}
+        self.log.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def celulas(self):
+        """Conteúdo das linhas preenchidas: [[texto por coluna], ...] (linhas vazias do fim são omitidas)."""
+        rows = [[e.get() for e in linha] for linha in self.entradas]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    def limpar(self):
+        for linha in self.entradas:
+            for e in linha:
+                e.delete(0, tk.END)
+        self.canvas.yview_moveto(0.0)
+        self.entradas[0][0].focus_set()
+
+    def primeira_celula(self):
+        """Centro da célula (0, 0) em coordenadas de tela — onde clicar para dar foco à tabela."""
+        e = self.entradas[0][0]
+        return e.winfo_rootx() + e.winfo_width() // 2, e.winfo_rooty() + e.winfo_height() // 2
+
+    def fechar(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+        self.root.destroy()
+
+
+def _controle(tabela, root):
+    """Comandos pelo stdin (uma linha cada), executados no mainloop; respostas em JSON no stdout."""
+    pedidos = queue.SimpleQueue()
+
+    def ler():
+        for linha in sys.stdin:
+            pedidos.put(linha.strip())
+        pedidos.put("sair")
+
+    def responder(obj):
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    def atender():
+        while True:
+            try:
+                cmd = pedidos.get_nowait()
+            except queue.Empty:
+                break
+            if cmd == "dump":
+                if tabela.log is not None:
+                    tabela.log.flush()
+                responder({"cells": tabela.celulas()})
+            elif cmd == "limpar":
+                tabela.limpar()
+                responder({"ok": True})
+            elif cmd == "sair":
+                tabela.fechar()
+                return
+        root.after(50, atender)
+
+    threading.Thread(target=ler, daemon=True).start()
+
+    def pronto():
+        root.update_idletasks()
+        root.focus_force()
+        tabela.entradas[0][0].focus_set()
+        x, y = tabela.primeira_celula()
+        responder({"ready": True, "x": x, "y": y})
+
+    root.after(200, pronto)
+    root.after(50, atender)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador de tabela para testes de automação.")
+    parser.add_argument("--linhas", type=int, default=25)
+    parser.add_argument("--colunas", type=int, default=8)
+    parser.add_argument("--crescer", action="store_true", help="cria linhas novas quando o foco passa da última")
+    parser.add_argument("--down-inicio", action="store_true", help="DOWN vai para a 1ª coluna da próxima linha")
+    parser.add_argument("--log", help="grava cada tecla em JSONL")
+    parser.add_argument("--controle", action="store_true", help="aceita comandos pelo stdin (dump/limpar/sair)")
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    root.title("Tabela de Teste para Automação")
+    root.geometry("1200x900")
+
+    # Cabeçalho
+    tk.Label(root, text="Simulador de Tabela (para testes de automação)", font=("Arial", 12, "bold")).pack(pady=5)
+
+    tabela = TabelaTeste(root, args.linhas, args.colunas, crescer=args.crescer,
+                         down_inicio=args.down_inicio, log_path=args.log)
+
+    # Botão para limpar tabela
+    tk.Button(root, text="Limpar Tudo", command=tabela.limpar, bg="#d9534f", fg="white", width=15).pack(pady=5)
+    root.protocol("WM_DELETE_WINDOW", tabela.fechar)
+
+    if args.controle:
+        _controle(tabela, root)
+
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
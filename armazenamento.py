@@ -0,0 +1,999 @@
+# armazenamento.py
+"""
+armazenamento.py
+Persistência das listas de itens e da configuração de categorias/sub-abas.
+- Não depende de Tk: usado tanto pela interface (digitador.py) quanto pelo motor headless (motor.py)
+- Configuração em config_abas.json
+- Dados das sub-abas em data/<categoria>/<subaba>.json, ou no banco SQLite (banco.py) se a entrada tiver "db"
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from bisect import insort
+from contextlib import contextmanager, nullcontext
+from decimal import Decimal
+from pathlib import Path
+
+# --- configurações de arquivos JSON ---
+BASE_DIR = Path(".")
+CONFIG_FILE = BASE_DIR / "config_abas.json"
+DATA_DIR = BASE_DIR / "data"
+
+# ==== helpers para path / nomes ====
+
+def safe_filename(name: str) -> str:
+    # cria um nome de arquivo simples a partir do nome da aba
+    s = name.strip().lower().replace(" ", "_")
+    # remove caracteres não-alfanum/underscore
+    s = "".join(ch for ch in s if ch.isalnum() or ch == "_")
+    if not s:
+        s = "tab"
+    return s + ".json"
+
+
+def atomic_write_text(path, text):
+    """Grava via arquivo temporário + rename: um crash no meio da escrita não deixa JSON truncado."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def ensure_default_config():
+    """Garante a pasta data e cria a config default se não existir (3 abas iniciais como exemplo)."""
+    DATA_DIR.mkdir(exist_ok=True)
+    if CONFIG_FILE.exists():
+        return
+    default = {
+        "Produtos em Processo": [
+            {"name": "CRUZILIA", "file": str((DATA_DIR / "produtos_em_processo_cruzilia.json").resolve())},
+            {"name": "BÚFALA", "file": str((DATA_DIR / "produtos_em_processo_bufala.json").resolve())},
+            {"name": "SORO", "file": str((DATA_DIR / "produtos_em_processo_soro.json").resolve())}
+        ]
+    }
+    CONFIG_FILE.write_text(json.dumps(default, ensure_ascii=False, indent=2), encoding="utf-8")
+    # create empty json files
+    for cat, tabs in default.items():
+        for t in tabs:
+            p = Path(t["file"])
+            p.parent.mkdir(parents=True, exist_ok=True)
+            if not p.exists():
+                p.write_text("[]", encoding="utf-8")
+
+
+def load_config(path=CONFIG_FILE):
+    """Lê config_abas.json: { "Categoria": [ {"name": subname, "file": "/abs/path.json"}, ... ] }.
+    Cada sub-aba pode ter também "paste" (ver paste_fields) e "template" (ver nav_template)."""
+    try:
+        with Path(path).open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_config(categories, path=CONFIG_FILE):
+    atomic_write_text(path, json.dumps(categories, ensure_ascii=False, indent=2))
+    # sub-abas guardadas no banco: nomes/ordem de categorias e sub-abas acompanham a config
+    dbs = {e["db"] for tabs in categories.values() for e in tabs if e.get("db")}
+    if dbs:
+        from banco import connect, resolve_db, sync_catalog
+        for db_path in dbs:
+            sync_catalog(categories, connect(resolve_db({"db": db_path})))
+
+
+def find_subtab(categories, category, name):
+    """Retorna a entrada {"name", "file"} da sub-aba, ou None se não existir."""
+    for entry in categories.get(category, []):
+        if entry.get("name") == name:
+            return entry
+    return None
+
+
+def new_entry(categories, name, file_path):
+    """Entrada de config de uma sub-aba nova; se a config já foi migrada para o banco, a sub-aba
+    também vai para ele (o "file" passa a servir só de identificador)."""
+    file_path = Path(file_path)
+    entry = {"name": name, "file": str(file_path.resolve())}
+    db = next((e["db"] for tabs in categories.values() for e in tabs if e.get("db")), None)
+    if db:
+        entry["db"] = db
+    else:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if not file_path.exists():
+            file_path.write_text("[]", encoding="utf-8")
+    return entry
+
+
+def ensure_subtab(categories, category, name):
+    """Categoria e sub-aba (nomes comparados sem diferenciar maiúsculas), criando as que faltarem
+    como a interface cria. Retorna (nome_da_categoria, entry, criada)."""
+    key = category.strip().casefold()
+    cat = next((c for c in categories if c.strip().casefold() == key), None)
+    if cat is None:
+        cat = category.strip()
+        categories[cat] = []
+    for entry in categories[cat]:
+        if entry.get("name", "").strip().casefold() == name.strip().casefold():
+            return cat, entry, False
+    entry = new_entry(categories, name.strip(), DATA_DIR / cat / safe_filename(f"{cat}_{name}"))
+    categories[cat].append(entry)
+    return cat, entry, True
+
+
+PASTE_FIELDS = ("codigo", "quantidade")
+
+
+def paste_fields(entry):
+    """Campos que a sub-aba cola pela área de transferência em vez de digitar.
+
+    Chave opcional "paste" da entrada: true (todos) ou lista com "codigo"/"quantidade".
+    """
+    value = entry.get("paste") if entry else None
+    if value is True:
+        return PASTE_FIELDS
+    if isinstance(value, list):
+        return tuple(f for f in PASTE_FIELDS if f in value)
+    return ()
+
+
+def nav_template(entry):
+    """Modelo de navegação da sub-aba (chave opcional "template"; ver motor.parse_template), ou None
+    para o caminho padrão."""
+    value = entry.get("template") if entry else None
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def resolve_tab_file(entry) -> Path:
+    """Caminho do JSON da sub-aba. Se o caminho absoluto salvo não existir (config vinda de outra máquina),
+    tenta o mesmo nome de arquivo dentro de DATA_DIR."""
+    path = Path(entry.get("file", ""))
+    if not path.exists():
+        local = DATA_DIR / Path(str(path).replace("\\", "/")).name
+        if local.exists():
+            return local
+    return path
+
+def open_store(entry):
+    """CodeStore da sub-aba com o backend da config: JSON por padrão, SQLite se a entrada tiver "db"."""
+    path = resolve_tab_file(entry)
+    if entry.get("db"):
+        from banco import SqliteBackend, connect, resolve_db
+        return CodeStore(path, backend=SqliteBackend(connect(resolve_db(entry)), entry["file"], entry.get("name", "")))
+    return CodeStore(path)
+
+
+def delete_tab_data(entry):
+    """Apaga os itens da sub-aba (o JSON, ou as linhas no banco)."""
+    if entry.get("db"):
+        from banco import connect, resolve_db
+        connect(resolve_db(entry)).delete_subtab(entry["file"])
+        return
+    path = Path(entry.get("file", ""))
+    for p in (path, log_path(path)):
+        if p.exists():
+            p.unlink()
+
+# ------------------ Registro de item ------------------
+
+DECIMAL_SEP = ","  # separador decimal usado ao digitar/exibir números com casas decimais
+
+
+def _grouped(int_part, sep):
+    # separador de milhar de verdade: "1.000.000" / "12,345" (1 a 3 dígitos e depois grupos de 3)
+    groups = int_part.split(sep)
+    return 1 <= len(groups[0]) <= 3 and all(len(g) == 3 for g in groups[1:])
+
+
+def parse_number(text, dot_thousands=True):
+    """Converte números no formato brasileiro ou internacional ("1.000,5", "1,000.5", "100000", "0,5").
+
+    Com dot_thousands=True, um único ponto seguido de exatamente 3 dígitos ("100.000") é milhar;
+    caso contrário é decimal ("1.5"). Parte inteira "0" ou com zero à esquerda nunca é milhar.
+    Separador repetido só vale em grupos de 3 ("1,5,0" não é número) e notação científica ("1e5")
+    não é aceita. Levanta ValueError se não for um número.
+
+    >>> parse_number("100.000"), parse_number("0.125"), parse_number("012.345"), parse_number("0,125")
+    (100000.0, 0.125, 12.345, 0.125)
+    >>> parse_number("1,000,000"), parse_number("1.000,5"), parse_number("-1,000.5")
+    (1000000.0, 1000.5, -1000.5)
+    >>> for bad in ("1,5,0", "1.5.0", "1e5", "nan", "1.000,5,0"):
+    ...     try:
+    ...         parse_number(bad)
+    ...     except ValueError:
+    ...         print("inválido:", bad)
+    inválido: 1,5,0
+    inválido: 1.5.0
+    inválido: 1e5
+    inválido: nan
+    inválido: 1.000,5,0
+    """
+    s = str(text).strip().replace(" ", "")
+    if not s:
+        raise ValueError("vazio")
+    sign = "-" if s[0] == "-" else ""
+    body = s[1:] if s[0] in "+-" else s
+    if not body or body.strip(".,0123456789") or not any(c.isdigit() for c in body):
+        raise ValueError(f"número inválido: {text}")
+    if "," in body and "." in body:
+        # o último separador é o decimal; o outro só pode aparecer como milhar antes dele
+        dec, thou = (",", ".") if body.rfind(",") > body.rfind(".") else (".", ",")
+        int_part, _, frac = body.rpartition(dec)
+        if dec in int_part or not _grouped(int_part, thou):
+            raise ValueError(f"número inválido: {text}")
+        body = int_part.replace(thou, "") + "." + frac
+    elif "," in body:
+        if body.count(",") > 1:
+            if not _grouped(body, ","):
+                raise ValueError(f"número inválido: {text}")
+            body = body.replace(",", "")
+        else:
+            body = body.replace(",", ".")
+    elif "." in body:
+        int_part, _, frac = body.rpartition(".")
+        if body.count(".") > 1:
+            if not _grouped(body, "."):
+                raise ValueError(f"número inválido: {text}")
+            body = body.replace(".", "")
+        elif dot_thousands and len(frac) == 3 and int_part and not int_part.startswith("0"):
+            body = int_part + frac
+    return float(sign + body)
+
+
+def format_number(value):
+    """Forma canônica para digitar/gravar: inteiros sem casas ("100000"), decimais com DECIMAL_SEP,
+    sempre por extenso (nunca "1e-05").
+
+    >>> format_number(100000.0), format_number(0.125), format_number(1e-05)
+    ('100000', '0,125', '0,00001')
+    """
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    # repr é o texto mais curto que volta ao mesmo float; Decimal tira a notação científica
+    return format(Decimal(repr(value)), "f").replace(".", DECIMAL_SEP)
+
+
+class Item:
+    """Item de uma sub-aba, normalizado uma vez ao carregar/importar.
+
+    - qtd: texto canônico pronto para digitar (ou o texto original, se inválido)
+    - timer: segundos (float), ou o texto original se inválido
+    - error: None, ou a mensagem do problema encontrado na linha
+
+    Continua se comportando como a tupla (codigo, nome, quantidade, timer) para desempacotamento.
+    """
+    __slots__ = ("codigo", "nome", "qtd", "timer", "error")
+
+    def __init__(self, codigo, nome="", qtd="100000", timer="1"):
+        self.codigo = str(codigo).strip()
+        self.nome = str(nome).strip()
+        self.error = None
+        errors = []
+
+        qtd = str(qtd).strip() or "100000"
+        try:
+            q = parse_number(qtd)
+            if q < 0 or not math.isfinite(q):
+                raise ValueError
+            self.qtd = format_number(q)
+        except ValueError:
+            self.qtd = qtd
+            errors.append(f"quantidade inválida '{qtd}'")
+
+        timer = str(timer).strip() or "1"
+        try:
+            t = parse_number(timer, dot_thousands=False)
+            if t < 0 or not math.isfinite(t):
+                raise ValueError
+            self.timer = t
+        except ValueError:
+            self.timer = timer
+            errors.append(f"tempo inválido '{timer}'")
+
+        if errors:
+            self.error = "; ".join(errors)
+
+    @property
+    def timer_text(self):
+        return self.timer if isinstance(self.timer, str) else format_number(self.timer)
+
+    def __iter__(self):
+        return iter((self.codigo, self.nome, self.qtd, self.timer_text))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, i):
+        return (self.codigo, self.nome, self.qtd, self.timer_text)[i]
+
+    def __eq__(self, other):
+        if not isinstance(other, (Item, tuple, list)):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"Item{tuple(self)!r}"
+
+
+def as_item(item):
+    """Aceita Item ou tupla (codigo, nome, qtd[, timer]) e devolve um Item."""
+    if isinstance(item, Item):
+        return item
+    return Item(*item)
+
+
+def item_errors(items):
+    """Lista [(idx, mensagem)] das linhas inválidas — para avisar antes de iniciar a digitação."""
+    return [(idx, it.error) for idx, it in enumerate(items) if it.error]
+
+# ------------------ Backends ------------------
+
+def parse_items(raw):
+    """Lista de Item a partir do conteúdo lido (dicts do JSON, tuplas do banco ou Item); ignora linhas sem código."""
+    cleaned = []
+    for item in raw:
+        if isinstance(item, Item):
+            rec = item
+        elif isinstance(item, dict):
+            rec = Item(item.get("codigo", ""), item.get("nome", ""),
+                       item.get("quantidade", "100000"), item.get("timer", "1"))
+        elif isinstance(item, (list, tuple)) and item:
+            rec = Item(*item[:4])
+        else:
+            continue
+        if rec.codigo:
+            cleaned.append(rec)
+    return cleaned
+
+
+def file_stat(path):
+    """(mtime_ns, tamanho) do arquivo, ou None se ele não existir."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class FileCache:
+    """JSON de sub-aba já interpretados, compartilhados por todos os CodeStore do processo.
+
+    Cada caminho guarda (stat, sha1, [Item]). Com o mesmo (mtime, tamanho) o arquivo não é nem lido;
+    se só os metadados mudaram (cópia, sincronização), o sha1 igual evita interpretar de novo.
+    Os Item nunca são alterados no lugar, então a mesma lista serve a vários stores (cada um copia).
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def read(self, path):
+        """(stat, sha1, [Item]) do arquivo; FileNotFoundError/erro de JSON sobem como numa leitura normal."""
+        key = self._key(path)
+        stat = file_stat(path)
+        if stat is None:
+            with self._lock:
+                self._entries.pop(key, None)
+            raise FileNotFoundError(path)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] == stat:
+            return cached
+        content = Path(path).read_bytes()
+        digest = hashlib.sha1(content).hexdigest()
+        if cached is not None and cached[1] == digest:
+            items = cached[2]
+        else:
+            items = parse_items(json.loads(content.decode("utf-8")))
+        entry = (stat, digest, items)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def put(self, path, digest, items):
+        """Registra o que acabou de ser gravado (a próxima leitura não precisa reinterpretar)."""
+        stat = file_stat(path)
+        entry = (stat, digest, list(items))
+        with self._lock:
+            if stat is None:
+                self._entries.pop(self._key(path), None)
+            else:
+                self._entries[self._key(path)] = entry
+        return entry
+
+    def digest(self, path, stat):
+        """sha1 do arquivo, reaproveitando o do cache se o stat ainda bate."""
+        with self._lock:
+            cached = self._entries.get(self._key(path))
+        if cached is not None and cached[0] == stat:
+            return cached[1]
+        return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+FILE_CACHE = FileCache()
+
+
+class JsonBackend:
+    """Um arquivo JSON por sub-aba, sempre regravado inteiro (atômico; pula a escrita se nada mudou)."""
+    row_level = False
+
+    def __init__(self, path, cache=None):
+        self.path = Path(path)
+        self.cache = cache or FILE_CACHE
+        self._saved_hash = None
+        self._stat = None  # (mtime_ns, tamanho) da última leitura/gravação deste backend
+
+    def read(self):
+        try:
+            self._stat, self._saved_hash, items = self.cache.read(self.path)
+        except FileNotFoundError:
+            self._stat, self._saved_hash = None, None
+            raise
+        except Exception:
+            # ilegível: guarda o stat para não reler o mesmo arquivo quebrado a cada verificação
+            self._stat, self._saved_hash = file_stat(self.path), None
+            raise
+        return list(items)
+
+    def write_all(self, items):
+        out = [{"codigo": c, "nome": n, "quantidade": q, "timer": t} for c, n, q, t in items]
+        text = json.dumps(out, ensure_ascii=False, indent=2)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        if digest == self._saved_hash:
+            return
+        atomic_write_text(self.path, text)
+        self._saved_hash = digest
+        self._stat = self.cache.put(self.path, digest, items)[0]
+
+    def changed(self):
+        """True se o arquivo foi alterado por fora desde a última leitura/gravação (stat e conteúdo)."""
+        stat = file_stat(self.path)
+        if stat == self._stat:
+            return False
+        if stat is None:
+            return True
+        try:
+            digest = self.cache.digest(self.path, stat)
+        except OSError:
+            return True
+        if digest == self._saved_hash:
+            self._stat = stat  # só os metadados mudaram
+            return False
+        return True
+
+    def transaction(self):
+        return nullcontext()
+
+COMPACT_OPS = 500  # linhas no log de operações antes de regravar o JSON inteiro
+
+
+def log_path(path):
+    """Log de operações da sub-aba, ao lado do JSON (<arquivo>.json.log)."""
+    path = Path(path)
+    return path.with_name(path.name + ".log")
+
+
+def _replay(items, rec):
+    # aplica uma linha do log; False se ela não cabe na lista (log de outra versão / corrompido)
+    op, idx = rec.get("op"), rec.get("idx", -1)
+    if op == "inserted" and 0 <= idx <= len(items):
+        items.insert(idx, Item(*rec["item"]))
+    elif op == "updated" and 0 <= idx < len(items):
+        items[idx] = Item(*rec["item"])
+    elif op == "removed" and 0 <= idx < len(items):
+        del items[idx]
+    else:
+        return False
+    return True
+
+
+class LogBackend(JsonBackend):
+    """JSON da sub-aba como retrato + log de operações (JSONL, só anexado) ao lado.
+
+    Inserir/alterar/excluir uma linha acrescenta uma linha curta ao log em vez de regravar o JSON;
+    read() aplica o log sobre o retrato. write_all() (compactação) regrava o JSON e apaga o log.
+    Cada linha do log guarda o sha1 do retrato a que se refere ("base"): se um crash ocorrer entre
+    gravar o JSON novo e apagar o log, as linhas antigas são ignoradas em vez de aplicadas de novo.
+    """
+    row_level = True
+
+    def __init__(self, path, cache=None):
+        super().__init__(path, cache)
+        self.log_path = log_path(self.path)
+        self.pending = 0  # linhas do log ainda não compactadas
+        self._log_stat = None
+        self._buffer = None  # linhas retidas durante uma transação
+        self._depth = 0
+        self._tail_checked = False
+
+    def _records(self):
+        try:
+            with self.log_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # linha cortada por um crash no meio da escrita
+                        continue
+        except FileNotFoundError:
+            return
+
+    def read(self):
+        try:
+            items = super().read()
+        except FileNotFoundError:
+            items = []
+        self.pending = 0
+        for rec in self._records():
+            if rec.get("base") != self._saved_hash:
+                continue
+            if not _replay(items, rec):
+                break
+            self.pending += 1
+        self._log_stat = file_stat(self.log_path)
+        return items
+
+    def _append(self, lines):
+        text = "".join(lines)
+        if not self._tail_checked:
+            # se um crash deixou a última linha cortada, começa numa linha nova
+            try:
+                with self.log_path.open("rb") as f:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell() > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            text = "\n" + text
+            except FileNotFoundError:
+                pass
+            self._tail_checked = True
+        with self.log_path.open("a", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending += len(lines)
+        self._log_stat = file_stat(self.log_path)
+
+    def apply(self, op, idx, item):
+        rec = {"base": self._saved_hash, "op": op, "idx": idx}
+        if op != "removed":
+            rec["item"] = list(item)
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        if self._buffer is not None:
+            self._buffer.append(line)
+        else:
+            self._append([line])
+
+    def write_all(self, items):
+        super().write_all(items)
+        try:
+            self.log_path.unlink()
+        except FileNotFoundError:
+            pass
+        self.pending = 0
+        self._log_stat = None
+
+    def changed(self):
+        return super().changed() or file_stat(self.log_path) != self._log_stat
+
+    @contextmanager
+    def transaction(self):
+        # as linhas da transação vão para o log de uma vez (uma escrita, um fsync) — ou nenhuma
+        if self._depth == 0:
+            self._buffer = []
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self._buffer = None
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            lines, self._buffer = self._buffer, None
+            if lines:
+                self._append(lines)
+
+# ------------------ Classe CodeStore ------------------
+
+UNDO_LIMIT = 100  # passos de desfazer guardados por sub-aba
+
+
+class CodeStore:
+    """Armazena e manipula lista de Item (codigo, nome, quantidade, timer) a partir de um JSON específico.
+
+    Quem precisa acompanhar mudanças registra um callback com subscribe(); ele recebe
+    (evento, idx, item) com evento em "inserted", "updated", "removed" ou "reset" (lista recarregada).
+
+    Várias alterações podem ser agrupadas com `with store.transaction():` — o arquivo é gravado
+    uma vez só no fim (ou nada muda, se der erro no meio).
+
+    A gravação fica a cargo do backend: LogBackend por padrão (JSON + log de operações, compactado a cada
+    COMPACT_OPS linhas e em compact()); banco.SqliteBackend grava por linha no banco.
+    path identifica a sub-aba também para o diário e as métricas.
+
+    Um índice código → posições (dict) responde index_of()/upsert_many() sem varrer a lista; é mantido
+    a cada alteração e só é reconstruído (sob demanda) depois de recarregar ou excluir no meio.
+
+    As operações em massa (set_quantity, scale_quantity, set_timer, delete_many, sort_by_code) valem
+    para a lista inteira ou só para as posições indicadas, gravam uma vez e emitem um único "reset".
+
+    undo()/redo() desfazem/refazem a última alteração (uma transação conta como um passo); o histórico
+    fica em memória e é zerado quando a lista é recarregada do disco.
+    """
+    def __init__(self, path: Path, backend=None):
+        self.path = Path(path)
+        self.backend = backend or LogBackend(self.path)
+        self.data = []
+        self.listeners = []
+        self.load_error = None
+        self._batch_depth = 0
+        self._dirty = False
+        self._codes = None  # codigo -> [posições em ordem]; None = reconstruir no próximo uso
+        self._undo = []  # grupos de passos (op, idx, antes, depois)
+        self._redo = []
+        self._group = None  # passos da transação em andamento
+        self._replaying = False
+        self._height = 0  # altura "absoluta" da pilha de desfazer (não diminui ao descartar os mais antigos)
+        self.load()
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _notify(self, event, idx=-1, item=None):
+        for callback in list(self.listeners):
+            callback(event, idx, item)
+
+    def load(self):
+        self.load_error = None
+        try:
+            raw = self.backend.read()
+        except FileNotFoundError:
+            raw = []
+        except Exception as e:
+            # arquivo corrompido: começa vazio, mas guarda o erro para a interface avisar
+            self.load_error = str(e)
+            raw = []
+        self.data = parse_items(raw)
+        self._codes = None
+        self._undo.clear()
+        self._redo.clear()
+        self._notify("reset")
+
+    def refresh(self):
+        """Recarrega só se o arquivo/banco mudou por fora (backend.changed()). True se recarregou."""
+        if self._batch_depth or not self.backend.changed():
+            return False
+        self.load()
+        return True
+
+    def save(self):
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self.backend.write_all(self.data)
+        self.load_error = None
+
+    def compact(self):
+        """Regrava o JSON inteiro e apaga o log de operações (só LogBackend com linhas pendentes)."""
+        if getattr(self.backend, "pending", 0) and not self._batch_depth:
+            self.backend.write_all(self.data)
+
+    def _persist(self, op, idx, item):
+        # backend por linha grava só a linha alterada; os demais regravam a lista inteira.
+        # Arquivo ilegível: regrava inteiro (o log seria aplicado sobre um retrato que não abre)
+        if self.backend.row_level and not self.load_error:
+            self.backend.apply(op, idx, item)
+            if not self._batch_depth and getattr(self.backend, "pending", 0) >= COMPACT_OPS:
+                self.compact()
+        else:
+            self.save()
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa alterações: um único save no fim; em caso de exceção a lista volta ao estado anterior."""
+        if self._batch_depth == 0:
+            snapshot = list(self.data)
+            self._group = []
+        self._batch_depth += 1
+        try:
+            with self.backend.transaction():
+                yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.data = snapshot
+                self._dirty = False
+                self._codes = None
+                self._group = None
+                self._notify("reset")
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            group, self._group = self._group, None
+            if group:
+                self._push(group)
+            if self._dirty:
+                self._dirty = False
+                self.save()
+            if getattr(self.backend, "pending", 0) >= COMPACT_OPS:
+                self.compact()
+
+    def get_all(self):
+        return list(self.data)
+
+    def errors(self):
+        return item_errors(self.data)
+
+    # --- índice de códigos ---
+    def _index(self):
+        if self._codes is None:
+            codes = {}
+            for idx, it in enumerate(self.data):
+                codes.setdefault(it.codigo, []).append(idx)
+            self._codes = codes
+        return self._codes
+
+    def _unindex(self, codigo, idx):
+        if self._codes is not None:
+            positions = self._codes.get(codigo)
+            if positions:
+                positions.remove(idx)
+                if not positions:
+                    del self._codes[codigo]
+
+    def _reindex(self, codigo, idx):
+        if self._codes is not None:
+            insort(self._codes.setdefault(codigo, []), idx)
+
+    def index_of(self, codigo):
+        """Posição da primeira linha com esse código, ou -1."""
+        positions = self._index().get(str(codigo).strip())
+        return positions[0] if positions else -1
+
+    def codes(self):
+        """Códigos distintos da lista."""
+        return self._index().keys()
+
+    def duplicates(self):
+        """{codigo: [posições]} dos códigos que aparecem mais de uma vez na própria lista."""
+        return {c: list(p) for c, p in self._index().items() if len(p) > 1}
+
+    # --- histórico (desfazer/refazer) ---
+    def _record(self, op, idx, old, new):
+        if self._replaying:
+            return
+        if self._group is not None:
+            self._group.append((op, idx, old, new))
+        else:
+            self._push([(op, idx, old, new)])
+
+    def _push(self, group):
+        self._undo.append(group)
+        del self._undo[:-UNDO_LIMIT]
+        self._redo.clear()
+        self._height += 1
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def _replay_group(self, group, backwards):
+        self._replaying = True
+        try:
+            with self.transaction():
+                for op, idx, old, new in (reversed(group) if backwards else group):
+                    if backwards:
+                        op, old, new = {"inserted": "removed", "removed": "inserted"}.get(op, op), new, old
+                    if op == "inserted":
+                        self._insert(idx, new)
+                    elif op == "updated":
+                        self._set(idx, new)
+                    elif op == "removed":
+                        self._pop(idx)
+                    else:
+                        self._replace(new)
+        finally:
+            self._replaying = False
+
+    def undo(self):
+        """Desfaz a última alteração (ou transação). False se não há o que desfazer."""
+        if not self._undo or self._batch_depth:
+            return False
+        group = self._undo.pop()
+        try:
+            self._replay_group(group, backwards=True)
+        except BaseException:
+            self._undo.append(group)
+            raise
+        self._redo.append(group)
+        self._height -= 1
+        return True
+
+    def redo(self):
+        """Refaz o último passo desfeito. False se não há o que refazer."""
+        if not self._redo or self._batch_depth:
+            return False
+        group = self._redo.pop()
+        try:
+            self._replay_group(group, backwards=False)
+        except BaseException:
+            self._redo.append(group)
+            raise
+        self._undo.append(group)
+        self._height += 1
+        return True
+
+    def undo_mark(self):
+        """Marca a posição atual do histórico (ver merge_undo)."""
+        return self._height
+
+    def merge_undo(self, mark):
+        """Junta num passo só tudo o que entrou no histórico depois de undo_mark() (ex.: importação em blocos).
+
+        Chame a cada bloco, não só no fim: o histórico guarda UNDO_LIMIT passos e os blocos mais antigos
+        de uma importação longa seriam descartados antes de juntar."""
+        n = min(self._height - mark, len(self._undo))
+        if n > 1:
+            # estende o primeiro grupo no lugar: chamado a cada bloco, cada passo é copiado uma vez só
+            first = self._undo[-n]
+            for group in self._undo[-n + 1:]:
+                first.extend(group)
+            del self._undo[-n + 1:]
+            self._height -= n - 1
+
+    # --- alterações de uma linha (gravam, notificam e entram no histórico) ---
+    def _insert(self, idx, item):
+        self.data.insert(idx, item)
+        if idx == len(self.data) - 1:
+            self._reindex(item.codigo, idx)
+        else:
+            self._codes = None  # posições seguintes mudaram: reconstrói no próximo uso
+        self._record("inserted", idx, None, item)
+        self._persist("inserted", idx, item)
+        self._notify("inserted", idx, item)
+
+    def _set(self, idx, item):
+        old = self.data[idx]
+        self._unindex(old.codigo, idx)
+        self.data[idx] = item
+        self._reindex(item.codigo, idx)
+        self._record("updated", idx, old, item)
+        self._persist("updated", idx, item)
+        self._notify("updated", idx, item)
+
+    def _pop(self, idx):
+        item = self.data.pop(idx)
+        if idx == len(self.data):
+            self._unindex(item.codigo, idx)
+        else:
+            self._codes = None
+        self._record("removed", idx, item, None)
+        self._persist("removed", idx, item)
+        self._notify("removed", idx, item)
+        return item
+
+    def add(self, codigo, nome, qtd="100000", timer="1"):
+        self._insert(len(self.data), Item(codigo, nome, qtd, timer))
+
+    def add_many(self, items):
+        """Adiciona vários (codigo, nome, qtd, timer) gravando o arquivo uma vez só."""
+        with self.transaction():
+            for codigo, nome, qtd, timer in items:
+                self.add(codigo, nome, qtd, timer)
+        return len(items)
+
+    def upsert_many(self, items):
+        """Como add_many, mas um código que já existe tem quantidade e tempo atualizados em vez de duplicar
+        (a descrição só é preenchida se estava vazia). Retorna (novos, atualizados, iguais)."""
+        added = updated = same = 0
+        with self.transaction():
+            for codigo, nome, qtd, timer in items:
+                idx = self.index_of(codigo)
+                if idx < 0:
+                    self.add(codigo, nome, qtd, timer)
+                    added += 1
+                    continue
+                old = self.data[idx]
+                new = Item(old.codigo, old.nome or nome, qtd, timer)
+                if new == old:
+                    same += 1
+                else:
+                    self.edit(idx, *new)
+                    updated += 1
+        return added, updated, same
+
+    def edit(self, idx, codigo, nome, qtd, timer):
+        if 0 <= idx < len(self.data):
+            self._set(idx, Item(codigo, nome, qtd, timer))
+
+    def delete(self, idx):
+        if 0 <= idx < len(self.data):
+            self._pop(idx)
+
+    # --- operações em massa: a lista nova sai de uma passada, é gravada uma vez e notificada com um "reset" ---
+    def _replace(self, data):
+        self._record("replace", -1, self.data, data)
+        self.data = data
+        self._codes = None
+        self.save()
+        self._notify("reset")
+
+    def update_many(self, fn, indices=None):
+        """Troca cada linha de indices (todas, se None) por fn(item); fn devolve None para manter a linha.
+        Retorna quantas linhas mudaram."""
+        chosen = None if indices is None else set(indices)
+        new, changed = [], 0
+        for idx, item in enumerate(self.data):
+            if chosen is None or idx in chosen:
+                out = fn(item)
+                if out is not None and out != item:
+                    item = out
+                    changed += 1
+            new.append(item)
+        if changed:
+            self._replace(new)
+        return changed
+
+    def set_quantity(self, qtd, indices=None):
+        return self.update_many(lambda it: Item(it.codigo, it.nome, qtd, it.timer_text), indices)
+
+    def set_timer(self, timer, indices=None):
+        return self.update_many(lambda it: Item(it.codigo, it.nome, it.qtd, timer), indices)
+
+    def scale_quantity(self, factor, indices=None):
+        """Multiplica a quantidade por factor; linhas com quantidade inválida ficam como estão."""
+        def scale(it):
+            try:
+                q = parse_number(it.qtd)
+            except ValueError:
+                return None
+            return Item(it.codigo, it.nome, format_number(round(q * factor, 6)), it.timer_text)
+        return self.update_many(scale, indices)
+
+    def delete_many(self, indices):
+        """Exclui as linhas de indices; retorna quantas saíram."""
+        chosen = set(indices)
+        new = [it for idx, it in enumerate(self.data) if idx not in chosen]
+        removed = len(self.data) - len(new)
+        if removed:
+            self._replace(new)
+        return removed
+
+    def sort_by_code(self):
+        """Ordena por código (numérico quando o código só tem dígitos); estável para códigos repetidos."""
+        key = lambda it: (0, int(it.codigo), "") if it.codigo.isdigit() else (1, 0, it.codigo.casefold())
+        new = sorted(self.data, key=key)
+        if new == self.data:
+            return False
+        self._replace(new)
+        return True
+
+
+def code_conflicts(stores):
+    """Códigos presentes em mais de uma sub-aba. stores: {nome: CodeStore} → {codigo: [nomes]}."""
+    seen = {}
+    for name, store in stores.items():
+        for codigo in store.codes():
+            seen.setdefault(codigo, []).append(name)
+    return {codigo: names for codigo, names in seen.items() if len(names) > 1}
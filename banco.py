@@ -0,0 +1,220 @@
+# banco.py
+"""
+banco.py
+Armazenamento em SQLite: um único arquivo indexado com categorias, sub-abas e itens.
+- SqliteBackend: backend do CodeStore que grava só a linha alterada (inserir/alterar/excluir)
+- migrate_json(): migração única do layout antigo (um JSON por sub-aba) para o banco
+- sync_catalog(): mantém as categorias/sub-abas do banco iguais às do config_abas.json
+A sub-aba é identificada no banco pelo campo "file" da config (não muda ao renomear).
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from armazenamento import DATA_DIR, CodeStore, resolve_tab_file
+
+DB_FILE = DATA_DIR / "digitador.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    pos INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS subtabs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
+    name TEXT NOT NULL,
+    pos INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    subtab_id INTEGER NOT NULL REFERENCES subtabs(id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    codigo TEXT NOT NULL,
+    nome TEXT NOT NULL DEFAULT '',
+    quantidade TEXT NOT NULL,
+    timer TEXT NOT NULL,
+    PRIMARY KEY (subtab_id, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_codigo ON items (codigo);
+"""
+
+
+class Database:
+    """Conexão compartilhada com o banco (uma por arquivo, ver connect()); transações aninháveis."""
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.RLock()
+        # autocommit: BEGIN/COMMIT explícitos em transaction(); a conexão é usada também pela thread de pré-carga
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._depth = 0
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            if self._depth == 0:
+                self.conn.execute("BEGIN")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute("COMMIT")
+
+    def data_version(self):
+        # muda só quando outra conexão (outro processo) grava no arquivo
+        return self.execute("PRAGMA data_version").fetchone()[0]
+
+    def subtab_id(self, key, name=""):
+        """id da sub-aba no banco (criada, ainda sem categoria, se não existir)."""
+        with self.lock:
+            row = self.conn.execute("SELECT id FROM subtabs WHERE key = ?", (key,)).fetchone()
+            if row:
+                return row[0]
+            return self.conn.execute("INSERT INTO subtabs (key, name) VALUES (?, ?)", (key, name or key)).lastrowid
+
+    def delete_subtab(self, key):
+        with self.transaction():
+            self.execute("DELETE FROM subtabs WHERE key = ?", (key,))
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def connect(path=DB_FILE):
+    """Database do arquivo (reaproveita a conexão já aberta)."""
+    key = str(Path(path).resolve())
+    with _databases_lock:
+        if key not in _databases:
+            _databases[key] = Database(path)
+        return _databases[key]
+
+
+def resolve_db(entry):
+    """Caminho do banco da sub-aba; como em resolve_tab_file, tenta DATA_DIR se o caminho salvo não existir."""
+    path = Path(entry["db"])
+    if not path.exists():
+        local = DATA_DIR / Path(str(path).replace("\\", "/")).name
+        if local.exists():
+            return local
+    return path
+
+
+class SqliteBackend:
+    """Backend do CodeStore guardado no banco: cada alteração grava só a linha afetada."""
+    row_level = True
+
+    def __init__(self, db, key, name=""):
+        self.db = db
+        self.subtab = db.subtab_id(key, name)
+        self._version = None
+
+    def read(self):
+        with self.db.lock:
+            self._version = self.db.data_version()
+            rows = self.db.execute(
+                "SELECT codigo, nome, quantidade, timer FROM items WHERE subtab_id = ? ORDER BY pos", (self.subtab,)
+            ).fetchall()
+        return rows
+
+    def changed(self):
+        """True se outro processo gravou no banco desde a leitura (não dá para saber qual sub-aba)."""
+        return self.db.data_version() != self._version
+
+    def write_all(self, items):
+        with self.db.transaction():
+            self.db.execute("DELETE FROM items WHERE subtab_id = ?", (self.subtab,))
+            self.db.conn.executemany(
+                "INSERT INTO items (subtab_id, pos, codigo, nome, quantidade, timer) VALUES (?, ?, ?, ?, ?, ?)",
+                ((self.subtab, pos, *tuple(it)) for pos, it in enumerate(items))
+            )
+
+    def _shift(self, start, delta):
+        # desloca pos >= start em delta; em dois passos (negativo e volta) para não colidir com a chave primária
+        self.db.execute("UPDATE items SET pos = -(pos + ?) - 1 WHERE subtab_id = ? AND pos >= ?",
+                        (delta, self.subtab, start))
+        self.db.execute("UPDATE items SET pos = -pos - 1 WHERE subtab_id = ? AND pos < 0", (self.subtab,))
+
+    def apply(self, op, idx, item):
+        """Aplica uma alteração do CodeStore ("inserted", "updated" ou "removed") na linha idx."""
+        with self.db.transaction():
+            if op == "inserted":
+                self._shift(idx, 1)
+                self.db.execute(
+                    "INSERT INTO items (subtab_id, pos, codigo, nome, quantidade, timer) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.subtab, idx, *tuple(item))
+                )
+            elif op == "updated":
+                self.db.execute(
+                    "UPDATE items SET codigo = ?, nome = ?, quantidade = ?, timer = ? WHERE subtab_id = ? AND pos = ?",
+                    (*tuple(item), self.subtab, idx)
+                )
+            elif op == "removed":
+                self.db.execute("DELETE FROM items WHERE subtab_id = ? AND pos = ?", (self.subtab, idx))
+                self._shift(idx + 1, -1)
+
+    def transaction(self):
+        return self.db.transaction()
+
+
+def sync_catalog(categories, db):
+    """Atualiza categorias e sub-abas do banco (nomes e ordem) a partir da config.
+    Só as sub-abas guardadas nesse banco entram; itens nunca são apagados aqui."""
+    with db.transaction():
+        seen = []
+        for cpos, (category, tabs) in enumerate(categories.items()):
+            db.execute("INSERT INTO categories (name, pos) VALUES (?, ?) "
+                       "ON CONFLICT(name) DO UPDATE SET pos = excluded.pos", (category, cpos))
+            cat_id = db.execute("SELECT id FROM categories WHERE name = ?", (category,)).fetchone()[0]
+            seen.append(category)
+            for tpos, entry in enumerate(tabs):
+                if not entry.get("db") or resolve_db(entry).resolve() != db.path.resolve():
+                    continue
+                db.execute("INSERT INTO subtabs (key, category_id, name, pos) VALUES (?, ?, ?, ?) "
+                           "ON CONFLICT(key) DO UPDATE SET category_id = excluded.category_id, "
+                           "name = excluded.name, pos = excluded.pos",
+                           (entry["file"], cat_id, entry.get("name", ""), tpos))
+        marks = ",".join("?" * len(seen))
+        db.execute(f"DELETE FROM categories WHERE name NOT IN ({marks})", seen)
+
+
+def migrate_json(categories, db_path=DB_FILE):
+    """Copia para o banco as sub-abas que ainda estão em JSON e marca "db" nas entradas da config.
+
+    Os JSON originais ficam no disco (como cópia de segurança). Sub-abas com JSON ilegível não são
+    migradas. Retorna (sub-abas migradas, itens copiados, [problemas]); quem chama grava a config.
+    """
+    db = connect(db_path)
+    migrated, copied, problems = 0, 0, []
+    for category, tabs in categories.items():
+        for entry in tabs:
+            if entry.get("db"):
+                continue
+            store = CodeStore(resolve_tab_file(entry))
+            if store.load_error:
+                problems.append(f"{category} / {entry.get('name')}: {store.load_error}")
+                continue
+            SqliteBackend(db, entry["file"], entry.get("name", "")).write_all(store.data)
+            entry["db"] = str(Path(db_path).resolve())
+            migrated += 1
+            copied += len(store.data)
+    sync_catalog(categories, db)
+    return migrated, copied, problems
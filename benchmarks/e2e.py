@@ -0,0 +1,231 @@
+# benchmarks/e2e.py
+"""
+benchmarks/e2e.py
+Benchmark de ponta a ponta: o motor digita de verdade no simulador (areadeteste.py) e o resultado
+é conferido célula a célula.
+- Para cada configuração de ritmo: itens/s, itens com erro (código ou quantidade diferente do
+  esperado) e teclas perdidas (enviadas pelo plano x recebidas pelo simulador)
+- No Linux sem DISPLAY sobe um Xvfb próprio (display virtual), então roda também em servidor/CI
+Resultados vão para benchmarks/e2e_history.jsonl, uma linha por execução.
+
+Uso: python benchmarks/e2e.py [--itens 200] [--configs normal,rapido,turbo] [--xvfb] [--no-save]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HISTORY = Path(__file__).resolve().parent / "e2e_history.jsonl"
+sys.path.insert(0, str(ROOT))
+
+from armazenamento import Item, format_number  # noqa: E402
+from motor import OP_CHAR, OP_KEY, OP_TYPE, Pacing, TypingEngine, compile_plan, load_pyautogui  # noqa: E402
+
+# colunas do simulador onde o motor escreve: código → ENTER → RIGHT×4 → ENTER → quantidade
+COL_CODIGO = 0
+COL_QTD = 6
+
+CONFIGS = {
+    "normal": Pacing,
+    "rapido": Pacing.fast,
+    # abaixo do modo rápido: serve para achar o ponto em que o alvo começa a perder teclas
+    "turbo": lambda: Pacing(char=0.0, after_code=0.01, after_enter=0.01, after_right=0.005,
+                            after_down=0.03, between_items=0.0, batched=True),
+}
+
+
+def gerar_itens(n, seed=0):
+    """Itens sintéticos (timer 0): códigos de 4 a 7 dígitos, quantidades inteiras e decimais."""
+    rnd = random.Random(seed)
+    items = []
+    for i in range(n):
+        codigo = str(rnd.randint(1000, 9999999))
+        if rnd.random() < 0.3:
+            qtd = format_number(rnd.randint(1, 99999) / 10)
+        else:
+            qtd = str(rnd.randint(1, 999999))
+        items.append(Item(codigo, f"item {i+1}", qtd, "0"))
+    return items
+
+
+def teclas_do_plano(plan):
+    """Quantas teclas o plano envia (cada caractere digitado conta uma)."""
+    return sum(len(arg) if kind == OP_TYPE else 1 for kind, arg, _ in plan.ops if kind in (OP_TYPE, OP_KEY, OP_CHAR))
+
+
+def conferir(items, cells):
+    """Índices dos itens cuja linha no simulador não bate exatamente com (código, quantidade)."""
+    erros = []
+    for i, it in enumerate(items):
+        row = cells[i] if i < len(cells) else []
+        codigo = row[COL_CODIGO] if len(row) > COL_CODIGO else ""
+        qtd = row[COL_QTD] if len(row) > COL_QTD else ""
+        if codigo != it.codigo or qtd != it.qtd:
+            erros.append(i)
+    return erros
+
+
+class Simulador:
+    """areadeteste.py num processo separado, controlado pelo stdin/stdout (--controle)."""
+    def __init__(self, log_path, env):
+        self.log_path = Path(log_path)
+        self.proc = subprocess.Popen(
+            [sys.executable, str(ROOT / "areadeteste.py"), "--linhas", "25", "--crescer", "--down-inicio",
+             "--controle", "--log", str(self.log_path)],
+            cwd=ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8"
+        )
+        ready = self._ler()
+        self.x, self.y = ready["x"], ready["y"]
+
+    def _ler(self):
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("o simulador fechou antes de responder (há display disponível?)")
+        return json.loads(line)
+
+    def comando(self, cmd):
+        self.proc.stdin.write(cmd + "\n")
+        self.proc.stdin.flush()
+        return self._ler()
+
+    def teclas_recebidas(self):
+        try:
+            with self.log_path.open("r", encoding="utf-8") as f:
+                return sum(1 for _ in f)
+        except OSError:
+            return 0
+
+    def fechar(self):
+        try:
+            self.proc.stdin.write("sair\n")
+            self.proc.stdin.flush()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+
+
+def iniciar_xvfb(display=":97"):
+    """Sobe um Xvfb e retorna o processo (ou None se não estiver instalado)."""
+    exe = shutil.which("Xvfb")
+    if exe is None:
+        return None
+    proc = subprocess.Popen([exe, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    if proc.poll() is not None:
+        return None
+    os.environ["DISPLAY"] = display
+    return proc
+
+
+def medir(sim, pyautogui, nome, items):
+    pacing = CONFIGS[nome]()
+    plan = compile_plan(items, pacing)
+    sim.comando("limpar")
+    time.sleep(0.3)
+    pyautogui.click(sim.x, sim.y)
+    antes = sim.teclas_recebidas()
+
+    engine = TypingEngine(start_delay=0.2, pacing=pacing)
+    t0 = time.perf_counter()
+    outcome = engine.run_plan(plan)
+    elapsed = time.perf_counter() - t0 - engine.start_delay
+    time.sleep(0.5)  # deixa o simulador processar as últimas teclas
+
+    cells = sim.comando("dump")["cells"]
+    erros = conferir(items, cells)
+    enviadas = teclas_do_plano(plan)
+    recebidas = sim.teclas_recebidas() - antes
+    return {
+        "config": nome,
+        "outcome": outcome,
+        "items": len(items),
+        "elapsed_s": round(elapsed, 3),
+        "estimated_s": round(plan.duration, 3),
+        "items_per_s": round(len(items) / elapsed, 3) if elapsed > 0 else 0.0,
+        "errors": len(erros),
+        "error_rate": round(len(erros) / len(items), 4),
+        "first_errors": erros[:10],
+        "keys_sent": enviadas,
+        "keys_lost": enviadas - recebidas,
+    }
+
+
+def _git_rev():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta contra o simulador de tabela.")
+    parser.add_argument("--itens", type=int, default=200)
+    parser.add_argument("--configs", default=",".join(CONFIGS), help=f"separadas por vírgula ({', '.join(CONFIGS)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--xvfb", action="store_true", help="usa um display virtual mesmo se houver DISPLAY")
+    parser.add_argument("--no-save", action="store_true", help="não grava no histórico")
+    args = parser.parse_args(argv)
+
+    nomes = [n.strip() for n in args.configs.split(",") if n.strip()]
+    desconhecidas = [n for n in nomes if n not in CONFIGS]
+    if desconhecidas:
+        parser.error(f"configuração desconhecida: {', '.join(desconhecidas)}")
+
+    xvfb = None
+    if sys.platform.startswith("linux") and (args.xvfb or not os.environ.get("DISPLAY")):
+        xvfb = iniciar_xvfb()
+        if xvfb is None:
+            print("Xvfb não encontrado: instale (apt install xvfb) ou rode com um DISPLAY.", file=sys.stderr)
+            return 2
+    pyautogui = load_pyautogui()
+    if pyautogui is None:
+        print("pyautogui não está instalado (pip install pyautogui).", file=sys.stderr)
+        if xvfb is not None:
+            xvfb.terminate()
+        return 2
+
+    items = gerar_itens(args.itens, args.seed)
+    tmp = tempfile.TemporaryDirectory()
+    sim = None
+    results = []
+    try:
+        sim = Simulador(Path(tmp.name) / "teclas.jsonl", dict(os.environ))
+        for nome in nomes:
+            r = medir(sim, pyautogui, nome, items)
+            results.append(r)
+            print(f"{nome:8s} {r['items_per_s']:7.2f} itens/s  ({r['elapsed_s']:.1f}s, estimado {r['estimated_s']:.1f}s)"
+                  f"  erros {r['errors']}/{r['items']} ({r['error_rate']:.2%})  teclas perdidas {r['keys_lost']}")
+    finally:
+        if sim is not None:
+            sim.fechar()
+        tmp.cleanup()
+        if xvfb is not None:
+            xvfb.terminate()
+
+    if not args.no_save and results:
+        entry = {
+            "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rev": _git_rev(),
+            "platform": sys.platform,
+            "python": sys.version.split()[0],
+            "items": args.itens,
+            "seed": args.seed,
+            "results": results,
+        }
+        with HISTORY.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
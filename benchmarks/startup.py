@@ -0,0 +1,90 @@
+# benchmarks/startup.py
+"""
+benchmarks/startup.py
+Mede o tempo de inicialização para acompanhar entre versões.
+- import: tempo de "import digitador" (e de "import motor", caminho do modo sem interface)
+- first_paint: criar o AutoTyperApp e desenhar a primeira tela (update())
+Cada medição roda num processo Python novo (imports frios). Resultados vão para
+benchmarks/startup_history.jsonl, uma linha por execução.
+
+Uso: python benchmarks/startup.py [--runs 5] [--no-gui] [--no-save]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HISTORY = Path(__file__).resolve().parent / "startup_history.jsonl"
+
+PROBE_GUI = """
+import json, time
+t0 = time.perf_counter()
+import digitador
+t1 = time.perf_counter()
+app = digitador.AutoTyperApp()
+app.update_idletasks()
+app.update()
+t2 = time.perf_counter()
+app.destroy()
+print(json.dumps({"import": t1 - t0, "first_paint": t2 - t1}))
+"""
+
+PROBE_HEADLESS = """
+import json, time
+t0 = time.perf_counter()
+import motor
+print(json.dumps({"import_headless": time.perf_counter() - t0}))
+"""
+
+
+def _probe(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _git_rev():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do Digitador de Ordem.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-gui", action="store_true", help="mede só o import do motor (sem display)")
+    parser.add_argument("--no-save", action="store_true", help="não grava no histórico")
+    args = parser.parse_args(argv)
+
+    samples = {}
+    for _ in range(args.runs):
+        probes = [PROBE_HEADLESS] if args.no_gui else [PROBE_HEADLESS, PROBE_GUI]
+        for code in probes:
+            for key, value in _probe(code).items():
+                samples.setdefault(key, []).append(value)
+
+    result = {
+        "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rev": _git_rev(),
+        "platform": sys.platform,
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+    }
+    for key, values in samples.items():
+        result[key + "_ms"] = round(statistics.median(values) * 1000, 1)
+        print(f"{key:16s} mediana {statistics.median(values) * 1000:8.1f} ms  (min {min(values) * 1000:.1f})")
+
+    if not args.no_save:
+        with HISTORY.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# busca.py
+"""
+busca.py
+Índice de busca em memória por código e descrição, sem depender de Tk.
+- StoreIndex: um por CodeStore (store_index()), atualizado pelos eventos do store linha a linha
+- A busca roda sobre um texto único por sub-aba ("\\n" entre linhas), com str.find em C,
+  refeito só quando a sub-aba mudou desde a última busca
+- SearchIndex junta várias sub-abas para a busca global da janela
+"""
+
+import weakref
+from bisect import bisect_right
+from collections import namedtuple
+
+SEARCH_LIMIT = 200
+
+SearchHit = namedtuple("SearchHit", "key idx codigo nome")
+
+
+def _key(item):
+    codigo, nome = item[0], item[1]
+    return f"{codigo}\t{nome}".replace("\n", " ").casefold()
+
+
+class StoreIndex:
+    """Chaves de busca ("codigo\\tnome" em minúsculas) de cada linha de um CodeStore."""
+    def __init__(self, store):
+        self._store = weakref.ref(store)
+        self.keys = [_key(it) for it in store.data]
+        self._blob = None
+        self._starts = None
+        store.subscribe(self._on_change)
+
+    def _on_change(self, event, idx, item):
+        if event == "inserted":
+            self.keys.insert(idx, _key(item))
+        elif event == "updated":
+            self.keys[idx] = _key(item)
+        elif event == "removed":
+            del self.keys[idx]
+        else:
+            store = self._store()
+            self.keys = [_key(it) for it in store.data] if store is not None else []
+        self._blob = None
+
+    def _joined(self):
+        if self._blob is None:
+            starts, pos = [], 1
+            for k in self.keys:
+                starts.append(pos)
+                pos += len(k) + 1
+            self._blob = "\n" + "\n".join(self.keys)
+            self._starts = starts
+        return self._blob, self._starts
+
+    def find(self, query, prefix=False, limit=None):
+        """Índices (em ordem) das linhas que contêm query; com prefix=True, só códigos que começam com query."""
+        q = query.replace("\n", " ").strip().casefold()
+        if not q:
+            return list(range(len(self.keys)))[:limit]
+        blob, starts = self._joined()
+        needle = "\n" + q if prefix else q
+        out = []
+        pos = blob.find(needle)
+        while pos != -1:
+            i = bisect_right(starts, pos + (1 if prefix else 0)) - 1
+            out.append(i)
+            if limit is not None and len(out) >= limit:
+                break
+            # continua no "\n" que abre a linha seguinte: cada linha entra uma vez só
+            pos = blob.find(needle, starts[i + 1] - 1) if i + 1 < len(starts) else -1
+        return out
+
+
+_indexes = weakref.WeakKeyDictionary()
+
+
+def store_index(store):
+    """StoreIndex do store (criado na primeira chamada e compartilhado depois)."""
+    index = _indexes.get(store)
+    if index is None:
+        index = _indexes[store] = StoreIndex(store)
+    return index
+
+
+class SearchIndex:
+    """Busca em várias sub-abas. key identifica a sub-aba para quem chama (ex.: o widget da aba)."""
+    def __init__(self):
+        self.sources = {}  # key -> (store, StoreIndex)
+
+    def add(self, key, store):
+        self.sources[key] = (store, store_index(store))
+
+    def remove(self, key):
+        self.sources.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self.sources
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Primeiro os códigos que começam com query, depois as demais linhas que a contêm."""
+        hits = []
+        by_prefix = {}  # key -> índices já encontrados pelo prefixo
+        for prefix in (True, False):
+            for key, (store, index) in self.sources.items():
+                left = limit - len(hits)
+                if left <= 0:
+                    return hits
+                found = by_prefix.get(key, ())
+                matches = index.find(query, prefix=prefix, limit=left + len(found))
+                if prefix:
+                    by_prefix[key] = set(matches)
+                else:
+                    matches = [i for i in matches if i not in found][:left]
+                hits.extend(SearchHit(key, i, store.data[i].codigo, store.data[i].nome) for i in matches)
+        return hits
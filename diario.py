@@ -0,0 +1,110 @@
+# diario.py
+"""
+diario.py
+Diário de execução (append-only) para retomar uma digitação interrompida.
+- Um arquivo JSONL por arquivo de sub-aba em data/journal/
+- Uma linha ao começar, uma por item concluído e uma ao terminar; cada linha é gravada com fsync
+- O diário guarda o hash do conteúdo da lista: se a lista mudou, não oferece retomar
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from armazenamento import DATA_DIR
+
+JOURNAL_DIR = DATA_DIR / "journal"
+
+
+def items_hash(items):
+    """Hash do que será digitado (código, quantidade, tempo) — o nome não influencia."""
+    h = hashlib.sha1()
+    for it in items:
+        codigo, _, qtd, timer = it
+        h.update(f"{codigo}\t{qtd}\t{timer}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class RunJournal:
+    """Diário de uma sub-aba. begin() de uma execução nova zera o arquivo; retomar continua anexando."""
+    def __init__(self, store_path, journal_dir=None):
+        store_path = Path(store_path)
+        key = hashlib.sha1(str(store_path.resolve()).encode("utf-8")).hexdigest()[:8]
+        self.path = Path(journal_dir or JOURNAL_DIR) / f"{store_path.stem}_{key}.jsonl"
+        self.run_id = None
+        self._tail_checked = False
+
+    def _append(self, record, truncate=False):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        if not truncate and not self._tail_checked:
+            # se um crash deixou a última linha cortada, começa numa linha nova
+            try:
+                with self.path.open("rb") as f:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell() > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            line = "\n" + line
+            except FileNotFoundError:
+                pass
+        self._tail_checked = True
+        with self.path.open("w" if truncate else "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def begin(self, content_hash, total, start_at=0):
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self._append({"run": self.run_id, "event": "begin", "hash": content_hash, "total": total,
+                      "start": start_at, "when": time.time()}, truncate=start_at == 0)
+
+    def item_done(self, idx, codigo):
+        self._append({"run": self.run_id, "event": "done", "idx": idx, "codigo": codigo})
+
+    def end(self, outcome):
+        self._append({"run": self.run_id, "event": "end", "outcome": outcome, "when": time.time()})
+
+    def records(self):
+        out = []
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        # linha cortada por um crash no meio da escrita
+                        continue
+        except FileNotFoundError:
+            pass
+        return out
+
+    def resume_point(self, content_hash):
+        """Índice (0-based) do próximo item a digitar, ou None se não há execução interrompida
+        para esta mesma lista."""
+        records = self.records()
+        if not records or records[0].get("hash") != content_hash:
+            return None
+        next_idx = None
+        for rec in records:
+            event = rec.get("event")
+            if event == "begin":
+                if rec.get("hash") != content_hash:
+                    return None
+                next_idx = rec.get("start", 0)
+            elif event == "done":
+                next_idx = max(next_idx or 0, rec.get("idx", -1) + 1)
+            elif event == "end" and rec.get("outcome") == "done":
+                next_idx = None
+        total = next((r.get("total") for r in reversed(records) if r.get("event") == "begin"), None)
+        if next_idx is None or next_idx <= 0 or (total is not None and next_idx >= total):
+            return None
+        return next_idx
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -7,181 +7,239 @@ Tkinter + ttkbootstrap app com categorias e sub-abas dinâmicas.
 - Dados das sub-abas em data/<categoria>/<subaba>.json
 """
 
-from ctypes import (
-    Structure, sizeof, c_int, c_uint, c_void_p,
-    windll, byref, addressof
-)
+import sys
+
+# com argumentos = modo headless (python -m digitador run/queue ...): não carrega Tk/ttkbootstrap
+if __name__ == "__main__" and len(sys.argv) > 1:
+    from motor import main
+    sys.exit(main(sys.argv[1:]))
 
-import json
+import math
+import queue
 import threading
-import time
+from bisect import bisect_left
 from pathlib import Path
 import tkinter as tk
-import openpyxl
 from tkinter import messagebox, filedialog, simpledialog
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-try:
-    import pyautogui
-except Exception:
-    pyautogui = None
-
-# --- configurações de arquivos JSON ---
-BASE_DIR = Path(".")
-CONFIG_FILE = BASE_DIR / "config_abas.json"
-DATA_DIR = BASE_DIR / "data"
-
-# garante pasta data
-DATA_DIR.mkdir(exist_ok=True)
-
-# ==== helpers para path / nomes ====
-
-def safe_filename(name: str) -> str:
-    # cria um nome de arquivo simples a partir do nome da aba
-    s = name.strip().lower().replace(" ", "_")
-    # remove caracteres não-alfanum/underscore
-    s = "".join(ch for ch in s if ch.isalnum() or ch == "_")
-    if not s:
-        s = "tab"
-    return s + ".json"
-
-# cria config default se não existir (mantive as 3 abas iniciais como exemplo)
-if not CONFIG_FILE.exists():
-    default = {
-        "Produtos em Processo": [
-            {"name": "CRUZILIA", "file": str((DATA_DIR / "produtos_em_processo_cruzilia.json").resolve())},
-            {"name": "BÚFALA", "file": str((DATA_DIR / "produtos_em_processo_bufala.json").resolve())},
-            {"name": "SORO", "file": str((DATA_DIR / "produtos_em_processo_soro.json").resolve())}
-        ]
-    }
-    CONFIG_FILE.write_text(json.dumps(default, ensure_ascii=False, indent=2), encoding="utf-8")
-    # create empty json files
-    for cat, tabs in default.items():
-        for t in tabs:
-            p = Path(t["file"])
-            p.parent.mkdir(parents=True, exist_ok=True)
-            if not p.exists():
-                p.write_text("[]", encoding="utf-8")
-
-# ======= EFEITO VIDRO / ACRYLIC =======
-
-class ACCENT_POLICY(Structure):
-    _fields_ = [
-        ("AccentState", c_int),
-        ("AccentFlags", c_int),
-        ("GradientColor", c_int),
-        ("AnimationId", c_int)
-    ]
-
-
-class WINCOMPATTRDATA(Structure):
-    _fields_ = [
-        ("Attribute", c_int),
-        ("Data", c_void_p),
-        ("SizeOfData", c_uint)
-    ]
-
-
-def enable_acrylic(hwnd):
-    try:
-        accent = ACCENT_POLICY()
-        accent.AccentState = 4  # Acrylic Blur
-        accent.GradientColor = 0x99FFFFFF  # Transparência + cor (ARGB)
-
-        data = WINCOMPATTRDATA()
-        data.Attribute = 19  # WCA_ACCENT_POLICY
-        data.Data = c_void_p(addressof(accent))
-        data.SizeOfData = sizeof(accent)
-
-        windll.user32.SetWindowCompositionAttribute(hwnd, byref(data))
-    except Exception:
-        pass
-
-
-def disable_acrylic(hwnd):
-    try:
-        accent = ACCENT_POLICY()
-        accent.AccentState = 0  # Desativa
-
-        data = WINCOMPATTRDATA()
-        data.Attribute = 19
-        data.Data = c_void_p(addressof(accent))
-        data.SizeOfData = sizeof(accent)
-
-        windll.user32.SetWindowCompositionAttribute(hwnd, byref(data))
-    except Exception:
-        pass
-
-# ------------------ Classe CodeStore (mantida) ------------------
-
-class CodeStore:
-    """Armazena e manipula lista de (codigo, nome, quantidade, timer) a partir de um JSON específico."""
-    def __init__(self, path: Path):
-        self.path = Path(path)
-        self.data = []
-        self.load()
-
-    def load(self):
-        try:
-            with self.path.open("r", encoding="utf-8") as f:
-                raw = json.load(f)
-        except Exception:
-            raw = []
-        cleaned = []
-        for item in raw:
-            if isinstance(item, dict):
-                cod = str(item.get("codigo", "")).strip()
-                nome = str(item.get("nome", "")).strip()
-                qtd = str(item.get("quantidade", "100000")).strip() or "100000"
-                timer = str(item.get("timer", "1")).strip()
-            elif isinstance(item, (list, tuple)):
-                cod = str(item[0]).strip()
-                nome = str(item[1]).strip() if len(item) > 1 else ""
-                qtd = str(item[2]).strip() if len(item) > 2 else "100000"
-                timer = str(item[3]).strip() if len(item) > 3 else "1"
-            else:
-                continue
-            if cod:
-                cleaned.append((cod, nome, qtd, timer))
-        self.data = cleaned
 
-    def save(self):
-        out = [{"codigo": c, "nome": n, "quantidade": q, "timer": t} for c, n, q, t in self.data]
-        with self.path.open("w", encoding="utf-8") as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
+from armazenamento import (
+    CONFIG_FILE, DATA_DIR, CodeStore, code_conflicts, delete_tab_data, ensure_default_config, find_subtab, load_config,
+    nav_template, new_entry, open_store, parse_number, paste_fields, resolve_tab_file, safe_filename, save_config
+)
+from importador import ImportCancelled, apply_bulk, bulk_jobs, iter_item_chunks, parse_parallel
+from busca import SearchIndex, store_index
+from diario import RunJournal, items_hash
+from metricas import PHASES, RunMetrics, recent_summaries
+from motor import (
+    PAUSE_HOTKEY, STOP_HOTKEY, Pacing, ProgressBus, QueueEntry, QueueRunner, RunControl, TypingEngine, compile_plan,
+    DEFAULT_TEMPLATE, format_eta, format_event, install_hotkeys, load_pyautogui, make_event, parse_between_actions,
+    parse_template
+)
+
+# garante pasta data e config default
+ensure_default_config()
+
+# ------------------ Lista virtualizada de cards ------------------
+
+CARD_STYLES = {"active": "info", "done": "success", "err": "danger"}
+
+
+class _CardRow:
+    """Um card reciclável: os widgets são criados uma vez e só recebem novos textos ao rolar."""
+    def __init__(self, canvas, on_edit, on_delete):
+        self.idx = -1
+        self.card = tb.Frame(canvas, padding=8, bootstyle="dark")
+        left = tb.Frame(self.card)
+        left.pack(side="left", fill="both", expand=True)
+        self.lbl_codigo = tb.Label(left, font=("Consolas", 11, "bold"))
+        self.lbl_codigo.pack(anchor="w")
+        self.lbl_nome = tb.Label(left, font=("Segoe UI", 10))
+        self.lbl_nome.pack(anchor="w")
+        self.lbl_qtd = tb.Label(left, font=("Segoe UI", 9, "italic"))
+        self.lbl_qtd.pack(anchor="w")
+        self.lbl_timer = tb.Label(left, font=("Segoe UI", 9, "italic"))
+        self.lbl_timer.pack(anchor="w")
+
+        right = tb.Frame(self.card)
+        right.pack(side="right")
+        tb.Button(right, text="Editar", bootstyle="info-outline", width=9, command=lambda: on_edit(self.idx)).pack(side="top", pady=2)
+        tb.Button(right, text="Excluir", bootstyle="danger-outline", width=9, command=lambda: on_delete(self.idx)).pack(side="top", pady=2)
+
+        self.window = canvas.create_window((4, 0), window=self.card, anchor="nw", state="hidden")
+        self.style = None
+
+    def bind(self, idx, item, state):
+        codigo, nome, qtd, timer = item
+        self.idx = idx
+        if item.error:
+            state = "err"
+            timer = f"{timer}  ⚠ {item.error}"
+        self.lbl_codigo.configure(text=f"Código: {codigo}")
+        self.lbl_nome.configure(text=f"{nome}")
+        self.lbl_qtd.configure(text=f"Quantidade: {qtd}")
+        self.lbl_timer.configure(text=f"Tempo: {timer}")
+        style = CARD_STYLES.get(state, "dark")
+        if style != self.style:
+            self.card.configure(bootstyle=style)
+            self.style = style
+
+
+class VirtualCardList(tb.Frame):
+    """Lista de cards virtualizada: só existem widgets para as linhas visíveis, reciclados na rolagem.
+    As linhas têm altura fixa, então índice → posição é direto (idx * ROW_HEIGHT).
+    Com set_filter() só um subconjunto (em ordem) é exibido; idx continua sendo o índice no store."""
+    ROW_HEIGHT = 118
+
+    def __init__(self, master, on_edit, on_delete, height=380):
+        super().__init__(master)
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.items = []
+        self.states = {}  # idx -> "active" / "done" / "err"
+        self.view = None  # índices exibidos quando filtrado (None = todos)
+        self.rows = []
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, height=height)
+        self.vsb = tb.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll, yscrollincrement=1)
+        self.vsb.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._refresh())
+        # roda do mouse só enquanto o ponteiro está sobre a lista
+        self.canvas.bind("<Enter>", lambda e: self._bind_wheel(True))
+        self.canvas.bind("<Leave>", lambda e: self._bind_wheel(False))
 
-    def get_all(self):
-        return list(self.data)
+    def _bind_wheel(self, on):
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            if on:
+                self.canvas.bind_all(seq, self._on_wheel)
+            else:
+                self.canvas.unbind_all(seq)
 
-    def add(self, codigo, nome, qtd="100000", timer="1"):
-        self.data.append((codigo, nome, qtd, timer))
-        self.save()
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            step = -self.ROW_HEIGHT
+        else:
+            step = self.ROW_HEIGHT
+        self.canvas.yview_scroll(step, "units")
+
+    def _on_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        self._refresh()
+
+    def set_filter(self, indices, to_top=False):
+        self.view = None if indices is None else list(indices)
+        self._resize()
+        if to_top:
+            self.canvas.yview_moveto(0)
+        self._refresh(force_from=0)
+
+    def _count(self):
+        return len(self.items) if self.view is None else len(self.view)
+
+    def set_items(self, items, keep_states=False):
+        self.items = list(items)
+        if not keep_states:
+            self.states.clear()
+        if self.view is not None:
+            # filtro antigo pode apontar para linhas que já não existem; quem filtra recalcula em seguida
+            self.view = [i for i in self.view if i < len(self.items)]
+        self._resize()
+        self._refresh(force_from=0)
+
+    # --- atualizações incrementais: só as linhas visíveis a partir de idx são redesenhadas ---
+    def insert(self, idx, item):
+        self.items.insert(idx, item)
+        self.states = {(i + 1 if i >= idx else i): st for i, st in self.states.items()}
+        if self.view is not None:
+            self.view = [i + 1 if i >= idx else i for i in self.view]
+        self._resize()
+        self._refresh(force_from=idx)
+
+    def update_row(self, idx, item):
+        if 0 <= idx < len(self.items):
+            self.items[idx] = item
+            self._refresh(force_from=idx, force_to=idx)
+
+    def remove(self, idx):
+        if 0 <= idx < len(self.items):
+            del self.items[idx]
+            self.states = {(i - 1 if i > idx else i): st for i, st in self.states.items() if i != idx}
+            if self.view is not None:
+                self.view = [i - 1 if i > idx else i for i in self.view if i != idx]
+            self._resize()
+            self._refresh(force_from=idx)
+
+    def _resize(self):
+        self.canvas.configure(scrollregion=(0, 0, 0, self._count() * self.ROW_HEIGHT))
+
+    def _refresh(self, force_from=None, force_to=None):
+        view_h = max(1, self.canvas.winfo_height())
+        width = max(1, self.canvas.winfo_width() - 8)
+        first = max(0, int(self.canvas.canvasy(0)) // self.ROW_HEIGHT)
+        needed = view_h // self.ROW_HEIGHT + 2
+        while len(self.rows) < needed:
+            self.rows.append(_CardRow(self.canvas, self.on_edit, self.on_delete))
+        count = self._count()
+        for j, row in enumerate(self.rows):
+            pos = first + j
+            if j < needed and pos < count:
+                idx = pos if self.view is None else self.view[pos]
+                forced = force_from is not None and force_from <= idx and (force_to is None or idx <= force_to)
+                if forced or row.idx != idx:
+                    row.bind(idx, self.items[idx], self.states.get(idx))
+                self.canvas.coords(row.window, 4, pos * self.ROW_HEIGHT)
+                self.canvas.itemconfigure(row.window, state="normal", width=width, height=self.ROW_HEIGHT - 8)
+            else:
+                row.idx = -1
+                self.canvas.itemconfigure(row.window, state="hidden")
 
-    def edit(self, idx, codigo, nome, qtd, timer):
-        if 0 <= idx < len(self.data):
-            self.data[idx] = (codigo, nome, qtd, timer)
-            self.save()
+    def set_state(self, idx, state):
+        if not 0 <= idx < len(self.items):
+            return
+        self.states[idx] = state
+        for row in self.rows:
+            if row.idx == idx:
+                row.bind(idx, self.items[idx], state)
 
-    def delete(self, idx):
-        if 0 <= idx < len(self.data):
-            del self.data[idx]
-            self.save()
+    def see(self, idx):
+        if not 0 <= idx < len(self.items):
+            return
+        pos = idx
+        if self.view is not None:
+            pos = bisect_left(self.view, idx)
+            if pos >= len(self.view) or self.view[pos] != idx:
+                return  # escondido pelo filtro
+        self.canvas.yview_moveto(pos * self.ROW_HEIGHT / max(1, self._count() * self.ROW_HEIGHT))
 
 # ------------------ TabFrame (mantida) ------------------
 
 class TabFrame(tb.Frame):
     """Frame que contém a lista e botões para cada sub-aba / arquivo JSON."""
-    def __init__(self, master, name, json_path):
+    def __init__(self, master, name, json_path, store=None):
         super().__init__(master)
         self.name = name
         self.json_path = Path(json_path)
-        # garante pasta do arquivo
-        self.json_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.json_path.exists():
-            self.json_path.write_text("[]", encoding="utf-8")
-        self.store = CodeStore(self.json_path)
-        self.cards = []
+        if store is None:
+            # garante pasta do arquivo
+            self.json_path.parent.mkdir(parents=True, exist_ok=True)
+            if not self.json_path.exists():
+                self.json_path.write_text("[]", encoding="utf-8")
+            store = CodeStore(self.json_path)
+        self.store = store
+        self.search = store_index(store)  # antes do subscribe abaixo: o filtro lê o índice já atualizado
+        self.import_cancel = None
         self._build_ui()
+        self.store.subscribe(self._on_store_change)
+        if self.store.load_error:
+            messagebox.showwarning(
+                "Arquivo inválido",
+                f"Não foi possível ler {self.json_path.name}:\n{self.store.load_error}\n\n"
+                "A lista foi aberta vazia; o arquivo só será sobrescrito quando houver alterações."
+            )
 
     def _import_excel(self):
         messagebox.showinfo(
@@ -203,40 +261,85 @@ class TabFrame(tb.Frame):
         if not file_path:
             return
 
-        try:
-            wb = openpyxl.load_workbook(file_path, data_only=True)
-            sheet = wb.active
-
-            novos_itens = []
-            for row in sheet.iter_rows(values_only=True):
-                if not row or len(row) < 3:
-                    continue
+        self._start_import(file_path)
 
-                codigo = str(row[0]).strip()
-                nome = str(row[1]).strip()
-                qtd = str(row[2]).strip()
-                timer = str(row[3]).strip() if len(row) > 3 else "1"
-
-                if codigo:
-                    novos_itens.append((codigo, nome, qtd, timer))
-
-            if not novos_itens:
-                messagebox.showwarning("Sem dados", "Nenhuma linha válida encontrada no Excel.")
-                return
-
-            # Adiciona os itens ao JSON atual
-            for cod, nome, qtd, timer in novos_itens:
-                self.store.add(cod, nome, qtd, timer)
+    # --- importação em segundo plano: a thread lê a planilha e a UI grava os blocos no store ---
+    def _start_import(self, file_path):
+        if self.import_cancel is not None:
+            messagebox.showwarning("Importação", "Já existe uma importação em andamento nesta aba.")
+            return
+        self.import_cancel = threading.Event()
+        self.import_queue = queue.Queue()
+        self.import_count = 0
+        self.import_added = self.import_updated = 0
+        self.import_mark = self.store.undo_mark()
+        self.import_progress.configure(mode="indeterminate", value=0)
+        self.import_progress.start(15)
+        self.import_label.configure(text="Lendo planilha...")
+        self.import_frame.pack(fill=X, padx=12, pady=(0,6), after=self.bar)
+        threading.Thread(target=self._import_worker, args=(file_path, self.import_cancel, self.import_queue), daemon=True).start()
+        self.after(50, self._poll_import)
+
+    @staticmethod
+    def _import_worker(file_path, cancel_event, q):
+        try:
+            progress = lambda read, total: q.put(("progress", read, total))
+            for chunk in iter_item_chunks(file_path, cancel_event=cancel_event, on_progress=progress):
+                q.put(("chunk", chunk, None))
+            q.put(("done", None, None))
+        except ImportCancelled:
+            q.put(("cancelled", None, None))
+        except Exception as e:
+            q.put(("error", e, None))
 
-            self._update_cards()
+    def _poll_import(self):
+        finished = None
+        try:
+            while True:
+                kind, a, b = self.import_queue.get_nowait()
+                if kind == "chunk":
+                    # cada bloco = uma gravação; código que já existe tem quantidade/tempo atualizados
+                    added, updated, same = self.store.upsert_many(a)
+                    self.store.merge_undo(self.import_mark)  # a importação inteira se desfaz de uma vez
+                    self.import_added += added
+                    self.import_updated += updated
+                    self.import_count += added + updated + same
+                elif kind == "progress":
+                    if b:
+                        self.import_progress.stop()
+                        self.import_progress.configure(mode="determinate", maximum=b, value=a)
+                    self.import_label.configure(text=f"{a} linhas lidas, {self.import_count} itens importados")
+                else:
+                    finished = (kind, a)
+                    break
+        except queue.Empty:
+            pass
+        if finished is None:
+            self.after(50, self._poll_import)
+            return
 
+        self.import_progress.stop()
+        self.import_frame.pack_forget()
+        self.import_cancel = None
+        kind, err = finished
+        if kind == "error":
+            messagebox.showerror("Erro ao importar", f"Ocorreu um erro ao importar o Excel:\n{err}\n\n{self.import_count} itens já tinham sido importados.")
+        elif kind == "cancelled":
+            messagebox.showinfo("Importação cancelada", f"Importação cancelada: {self.import_count} itens já importados foram mantidos.")
+        elif not self.import_count:
+            messagebox.showwarning("Sem dados", "Nenhuma linha válida encontrada no Excel.")
+        else:
             messagebox.showinfo(
                 "Importação concluída",
-                f"{len(novos_itens)} itens foram importados com sucesso!"
+                f"{self.import_count} itens foram importados com sucesso!\n\n"
+                f"{self.import_added} novos, {self.import_updated} atualizados, "
+                f"{self.import_count - self.import_added - self.import_updated} sem alteração."
             )
 
-        except Exception as e:
-            messagebox.showerror("Erro ao importar", f"Ocorreu um erro ao importar o Excel:\n{e}")
+    def _cancel_import(self):
+        if self.import_cancel is not None:
+            self.import_cancel.set()
+            self.import_label.configure(text="Cancelando...")
 
     def _build_ui(self):
         ctrl = tb.Frame(self)
@@ -244,53 +347,76 @@ class TabFrame(tb.Frame):
 
         tb.Label(self, text=f"🗂️ {self.name}", font=("Segoe UI", 12, "bold")).pack(anchor="w", pady=(6,4))
 
-        bar = tb.Frame(self)
+        bar = self.bar = tb.Frame(self)
         bar.pack(fill=X, pady=6)
         tb.Button(bar, text="➕ Adicionar", bootstyle="success", command=self._add_item).pack(side="left", padx=6)
         tb.Button(bar, text="🔄 Atualizar", bootstyle="secondary", command=self._reload).pack(side="left", padx=6)
+        tb.Button(bar, text="↩️", bootstyle="secondary-outline", command=self.undo, width=3).pack(side="left", padx=(6,0))
+        tb.Button(bar, text="↪️", bootstyle="secondary-outline", command=self.redo, width=3).pack(side="left", padx=(2,6))
         tb.Button(bar, text="📥 Importar Excel", bootstyle="info", command=self._import_excel).pack(side="left", padx=6)
-
-        container = tb.Frame(self)
-        container.pack(fill=BOTH, expand=True, padx=4, pady=(6,8))
-
-        self.canvas = tk.Canvas(container, highlightthickness=0, height=380)
-        self.scroll_frame = tb.Frame(self.canvas)
-
-        vsb = tb.Scrollbar(container, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=vsb.set)
-        vsb.pack(side="right", fill="y")
-        self.canvas.pack(side="left", fill="both", expand=True)
-
-        self.window_id = self.canvas.create_window((0, 0), window=self.scroll_frame, anchor="nw")
-
-        self.scroll_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.bind("<Configure>", lambda e: self.canvas.itemconfig(self.window_id, width=e.width))
+        # alterações em massa: valem para os cards filtrados, ou para a lista inteira sem filtro
+        bulk = tb.Menubutton(bar, text="🧮 Em massa", bootstyle="secondary-outline")
+        menu = tk.Menu(bulk, tearoff=0)
+        menu.add_command(label="Definir quantidade...", command=self._bulk_set_quantity)
+        menu.add_command(label="Multiplicar quantidade...", command=self._bulk_scale)
+        menu.add_command(label="Definir tempo...", command=self._bulk_set_timer)
+        menu.add_separator()
+        menu.add_command(label="Ordenar por código", command=self._bulk_sort)
+        menu.add_command(label="Excluir itens...", command=self._bulk_delete)
+        bulk["menu"] = menu
+        bulk.pack(side="left", padx=6)
+        # filtro só da exibição: a digitação sempre usa a lista inteira
+        self.filter_var = tk.StringVar()
+        tb.Entry(bar, textvariable=self.filter_var, width=24).pack(side="right", padx=6)
+        tb.Label(bar, text="🔎 Filtrar:").pack(side="right")
+        self.filter_var.trace_add("write", lambda *a: self._apply_filter(to_top=True))
+
+        # progresso da importação (só aparece durante a importação)
+        self.import_frame = tb.Frame(self)
+        self.import_progress = tb.Progressbar(self.import_frame, bootstyle="info-striped")
+        self.import_progress.pack(side="left", fill=X, expand=True, padx=(0,6))
+        self.import_label = tb.Label(self.import_frame, font=("Segoe UI", 9))
+        self.import_label.pack(side="left", padx=6)
+        tb.Button(self.import_frame, text="Cancelar", bootstyle="danger-outline", command=self._cancel_import).pack(side="right")
+
+        self.list_view = VirtualCardList(self, on_edit=self._edit_item, on_delete=self._delete_item)
+        self.list_view.pack(fill=BOTH, expand=True, padx=4, pady=(6,8))
 
         self._update_cards()
 
     def _reload(self):
-        self.store.load()
-        self._update_cards()
+        # relê só se o arquivo mudou por fora; sem mudança a lista não é reconstruída
+        self.store.refresh()
+
+    def undo(self):
+        if self.import_cancel is None:
+            self.store.undo()
+
+    def redo(self):
+        if self.import_cancel is None:
+            self.store.redo()
 
     def _update_cards(self):
-        for w in self.scroll_frame.winfo_children():
-            w.destroy()
-        self.cards.clear()
-        for idx, (codigo, nome, qtd, timer) in enumerate(self.store.get_all()):
-            card = tb.Frame(self.scroll_frame, padding=8, bootstyle="dark")
-            card.pack(fill=X, pady=4, padx=4)
-            self.cards.append(card)
-            left = tb.Frame(card)
-            left.pack(side="left", fill="both", expand=True)
-            tb.Label(left, text=f"Código: {codigo}", font=("Consolas", 11, "bold")).pack(anchor="w")
-            tb.Label(left, text=f"{nome}", font=("Segoe UI", 10)).pack(anchor="w")
-            tb.Label(left, text=f"Quantidade: {qtd}", font=("Segoe UI", 9, "italic")).pack(anchor="w")
-            tb.Label(left, text=f"Tempo: {timer}", font=("Segoe UI", 9, "italic")).pack(anchor="w")
-
-            right = tb.Frame(card)
-            right.pack(side="right")
-            tb.Button(right, text="Editar", bootstyle="info-outline", width=9, command=lambda i=idx: self._edit_item(i)).pack(side="top", pady=2)
-            tb.Button(right, text="Excluir", bootstyle="danger-outline", width=9, command=lambda i=idx: self._delete_item(i)).pack(side="top", pady=2)
+        self.list_view.set_items(self.store.get_all())
+        self._apply_filter()
+
+    def _apply_filter(self, to_top=False):
+        query = self.filter_var.get().strip()
+        self.list_view.set_filter(self.search.find(query) if query else None, to_top=to_top)
+
+    def _on_store_change(self, event, idx, item):
+        # aplica só a linha afetada em vez de reconstruir a lista
+        if event == "inserted":
+            self.list_view.insert(idx, item)
+        elif event == "updated":
+            self.list_view.update_row(idx, item)
+        elif event == "removed":
+            self.list_view.remove(idx)
+        else:
+            self._update_cards()
+            return
+        if self.list_view.view is not None:
+            self._apply_filter()
 
     def _add_item(self):
         codigo = tb.dialogs.Querybox.get_string("Digite o código:", "Adicionar novo código")
@@ -300,10 +426,9 @@ class TabFrame(tb.Frame):
         qtd = tb.dialogs.Querybox.get_string("Digite a quantidade (padrão 100000):", "Adicionar novo código") or "100000"
         timer = tb.dialogs.Querybox.get_string("Digite o tempo (s):", "Adicionar tempo") or "1"
         self.store.add(codigo.strip(), nome.strip(), qtd.strip(), timer.strip())
-        self._update_cards()
 
     def _edit_item(self, idx):
-        codigo, nome, qtd, timer = self.store.get_all()[idx]
+        codigo, nome, qtd, timer = self.store.data[idx]
         novo_codigo = tb.dialogs.Querybox.get_string("Editar código:", initialvalue=codigo)
         if not novo_codigo:
             return
@@ -312,44 +437,285 @@ class TabFrame(tb.Frame):
         nova_timer = tb.dialogs.Querybox.get_string("Editar tempo (s):", initialvalue=timer) or "1"
 
         self.store.edit(idx, novo_codigo.strip(), novo_nome.strip(), nova_qtd.strip(), nova_timer.strip())
-        self._update_cards()
 
     def _delete_item(self, idx):
-        codigo, nome, _ = self.store.get_all()[idx]
+        codigo, nome = self.store.data[idx][:2]
         if messagebox.askyesno("Confirmar exclusão", f"Deseja remover {codigo} - {nome}?"):
             self.store.delete(idx)
-            self._update_cards()
+
+    # --- alterações em massa (uma transação, uma gravação e uma reconstrução da lista) ---
+    def _bulk_scope(self):
+        # (posições ou None para todas, descrição para as perguntas)
+        view = self.list_view.view
+        if view is not None:
+            return list(view), f"{len(view)} itens filtrados"
+        return None, f"todos os {len(self.store.data)} itens"
+
+    def _ask_number(self, prompt, title, dot_thousands=True):
+        text = tb.dialogs.Querybox.get_string(prompt, title)
+        if not text:
+            return None
+        try:
+            value = parse_number(text, dot_thousands=dot_thousands)
+            if value < 0 or not math.isfinite(value):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror(title, f"Valor inválido: {text}")
+            return None
+        return text.strip(), value
+
+    def _bulk_done(self, title, changed):
+        messagebox.showinfo(title, f"{changed} itens alterados.")
+
+    def _bulk_set_quantity(self):
+        indices, desc = self._bulk_scope()
+        answer = self._ask_number(f"Nova quantidade para {desc}:", "Definir quantidade")
+        if answer:
+            self._bulk_done("Definir quantidade", self.store.set_quantity(answer[0], indices))
+
+    def _bulk_scale(self):
+        indices, desc = self._bulk_scope()
+        answer = self._ask_number(f"Multiplicar a quantidade de {desc} por:", "Multiplicar quantidade", dot_thousands=False)
+        if answer:
+            self._bulk_done("Multiplicar quantidade", self.store.scale_quantity(answer[1], indices))
+
+    def _bulk_set_timer(self):
+        indices, desc = self._bulk_scope()
+        answer = self._ask_number(f"Novo tempo (s) para {desc}:", "Definir tempo", dot_thousands=False)
+        if answer:
+            self._bulk_done("Definir tempo", self.store.set_timer(answer[0], indices))
+
+    def _bulk_sort(self):
+        # a lista inteira, mesmo com filtro: a ordem vale para a digitação
+        self.store.sort_by_code()
+
+    def _bulk_delete(self):
+        indices, desc = self._bulk_scope()
+        if indices is None:
+            indices = range(len(self.store.data))
+        if indices and messagebox.askyesno("Confirmar exclusão", f"Deseja remover {desc}?"):
+            self.store.delete_many(indices)
 
     def get_items(self):
-        """Retorna lista de (codigo, nome, quantidade, timer) atual, aplicando override se preenchido."""
+        """Retorna lista de (codigo, nome, quantidade, timer) atual (as alterações em massa já estão no store)."""
         return self.store.get_all()
 
     def highlight_card(self, idx, style="success"):
-        try:
-            if 0 <= idx < len(self.cards):
-                widget = self.cards[idx]
-                bg = {"active": "#1e88e5", "done": "#2e7d32", "err": "#b00020"}.get(style, "#1e88e5")
-                widget.configure(style="secondary.TFrame")
-                for child in widget.winfo_children():
-                    try:
-                        child.configure(background=bg)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
+        self.list_view.set_state(idx, style)
 
     def scroll_to(self, idx):
-        if 0 <= idx < len(self.cards):
-            self.canvas.yview_moveto(idx / max(1, len(self.cards)))
+        self.list_view.see(idx)
+
+# ------------------ Sub-aba preguiçosa ------------------
+
+class LazySubTab(tb.Frame):
+    """Página leve do notebook de sub-abas: o TabFrame (que lê o JSON e monta a lista) só é criado
+    na primeira vez que a sub-aba é exibida. preload() lê o JSON numa thread para deixar a troca instantânea."""
+    def __init__(self, master, name, entry):
+        super().__init__(master)
+        self.name = name
+        self.entry = entry
+        self.json_path = resolve_tab_file(entry)
+        self.tabframe = None
+        self._preloaded = None
+        self._preload_thread = None
+
+    def preload(self):
+        if self.tabframe is not None or self._preload_thread is not None:
+            return
+
+        def work():
+            try:
+                self._preloaded = open_store(self.entry)
+            except Exception:
+                self._preloaded = None
+
+        self._preload_thread = threading.Thread(target=work, daemon=True)
+        self._preload_thread.start()
+
+    def loading(self):
+        return self.tabframe is None and self._preload_thread is not None and self._preload_thread.is_alive()
+
+    def loaded_store(self):
+        """Store já carregado (aberto ou pré-carregado), ou None se ainda não."""
+        if self.tabframe is not None:
+            return self.tabframe.store
+        if self._preload_thread is not None and not self._preload_thread.is_alive():
+            return self._preloaded
+        return None
+
+    def ensure(self):
+        if self.tabframe is None:
+            store = None
+            if self._preload_thread is not None:
+                self._preload_thread.join()
+                store = self._preloaded
+            if store is None and self.entry.get("db"):
+                store = open_store(self.entry)
+            self.tabframe = TabFrame(self, self.name, self.json_path, store=store)
+            self.tabframe.pack(fill=BOTH, expand=True)
+        return self.tabframe
+
+# ------------------ Fila de listas ------------------
+
+class QueueDialog(tb.Toplevel):
+    """Monta a fila: escolhe sub-abas de qualquer categoria, ordena e define as ações entre listas."""
+    def __init__(self, app):
+        super().__init__(title="Fila de listas")
+        self.app = app
+        self.geometry("560x420")
+        self.available = [(cat, t.get("name")) for cat, tabs in app.categories.items() for t in tabs]
+        self.queue = []
+
+        body = tb.Frame(self, padding=10)
+        body.pack(fill=BOTH, expand=True)
+
+        left = tb.Frame(body)
+        left.pack(side="left", fill=BOTH, expand=True)
+        tb.Label(left, text="Sub-abas", font=("Segoe UI", 10, "bold")).pack(anchor="w")
+        self.lst_available = tk.Listbox(left, selectmode="extended", exportselection=False)
+        self.lst_available.pack(fill=BOTH, expand=True)
+        for cat, name in self.available:
+            self.lst_available.insert("end", f"{cat} / {name}")
+
+        mid = tb.Frame(body, padding=(8, 20))
+        mid.pack(side="left", fill=Y)
+        tb.Button(mid, text="→", bootstyle="success", width=4, command=self._add).pack(pady=3)
+        tb.Button(mid, text="←", bootstyle="danger", width=4, command=self._remove).pack(pady=3)
+        tb.Button(mid, text="↑", bootstyle="secondary", width=4, command=lambda: self._move(-1)).pack(pady=3)
+        tb.Button(mid, text="↓", bootstyle="secondary", width=4, command=lambda: self._move(1)).pack(pady=3)
+
+        right = tb.Frame(body)
+        right.pack(side="left", fill=BOTH, expand=True)
+        tb.Label(right, text="Fila (em ordem)", font=("Segoe UI", 10, "bold")).pack(anchor="w")
+        self.lst_queue = tk.Listbox(right, exportselection=False)
+        self.lst_queue.pack(fill=BOTH, expand=True)
+
+        bottom = tb.Frame(self, padding=(10, 0, 10, 10))
+        bottom.pack(fill=X)
+        tb.Label(bottom, text="Entre listas:").pack(side="left")
+        self.between = tk.StringVar(value="wait 3")
+        tb.Entry(bottom, textvariable=self.between).pack(side="left", fill=X, expand=True, padx=6)
+        tb.Button(bottom, text="▶️ Iniciar fila", bootstyle="primary", command=self._start).pack(side="right")
+        tb.Label(self, text='Ex.: "wait 3; ctrl+s; enter" (separe as ações com ;)', font=("Segoe UI", 8, "italic")).pack(anchor="w", padx=10, pady=(0, 8))
+
+    def _refresh(self, select=None):
+        self.lst_queue.delete(0, "end")
+        for cat, name in self.queue:
+            self.lst_queue.insert("end", f"{cat} / {name}")
+        if select is not None:
+            self.lst_queue.selection_set(select)
+
+    def _add(self):
+        for i in self.lst_available.curselection():
+            self.queue.append(self.available[i])
+        self._refresh()
+
+    def _remove(self):
+        for i in reversed(self.lst_queue.curselection()):
+            del self.queue[i]
+        self._refresh()
+
+    def _move(self, delta):
+        sel = self.lst_queue.curselection()
+        if not sel:
+            return
+        i = sel[0]
+        j = i + delta
+        if 0 <= j < len(self.queue):
+            self.queue[i], self.queue[j] = self.queue[j], self.queue[i]
+            self._refresh(select=j)
+
+    def _start(self):
+        if not self.queue:
+            messagebox.showwarning("Fila", "Adicione pelo menos uma sub-aba à fila.", parent=self)
+            return
+        try:
+            between = parse_between_actions(self.between.get())
+        except ValueError as e:
+            messagebox.showerror("Fila", f"Ações entre listas inválidas:\n{e}", parent=self)
+            return
+        if self.app._start_queue(list(self.queue), between):
+            self.destroy()
+
+# ------------------ Painel de métricas ------------------
+
+class MetricsDialog(tb.Toplevel):
+    """Execuções recentes da sub-aba (itens/min, motivo de parada) e tempos por fase da selecionada."""
+    def __init__(self, app, tabframe):
+        super().__init__(title=f"Métricas — {tabframe.name}")
+        self.geometry("720x520")
+        self.summaries = recent_summaries(tabframe.json_path)
+
+        body = tb.Frame(self, padding=10)
+        body.pack(fill=BOTH, expand=True)
+        if not self.summaries:
+            tb.Label(body, text="Nenhuma execução registrada para esta sub-aba.").pack(anchor="w")
+            return
+
+        tb.Label(body, text="Execuções recentes", font=("Segoe UI", 10, "bold")).pack(anchor="w")
+        cols = ("inicio", "modo", "resultado", "itens", "duracao", "ritmo")
+        self.runs = tb.Treeview(body, columns=cols, show="headings", height=6)
+        for col, text, width in zip(cols, ("Início", "Modo", "Resultado", "Itens", "Duração", "Itens/min"),
+                                    (150, 70, 90, 60, 80, 80)):
+            self.runs.heading(col, text=text)
+            self.runs.column(col, width=width, anchor="w")
+        for i, s in enumerate(self.summaries):
+            self.runs.insert("", "end", iid=str(i), values=(
+                s.get("started", "").replace("T", " "), s.get("mode", ""), s.get("outcome", ""),
+                s.get("items_done", 0), format_eta(s.get("elapsed_s", 0)), s.get("items_per_min", 0)))
+        self.runs.pack(fill=X)
+        self.runs.bind("<<TreeviewSelect>>", lambda e: self._show_run())
+
+        tb.Label(body, text="Tempo por fase (s) e histograma", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=(10, 0))
+        self.detail = tk.Text(body, height=16, font=("Consolas", 9), wrap="none")
+        self.detail.pack(fill=BOTH, expand=True)
+        self.runs.selection_set("0")
+        self._show_run()
+
+    def _show_run(self):
+        sel = self.runs.selection()
+        summary = self.summaries[int(sel[0])] if sel else self.summaries[0]
+        lines = [f"{'fase':12s}{'média':>9s}{'p50':>9s}{'p95':>9s}{'máx':>9s}"]
+        for phase, st in summary.get("phases", {}).items():
+            lines.append(f"{phase:12s}{st['mean']:9.3f}{st['p50']:9.3f}{st['p95']:9.3f}{st['max']:9.3f}")
+        for phase in PHASES:
+            counts = summary.get("histogram", {}).get(phase)
+            if not counts or not any(counts.values()):
+                continue
+            lines.append("")
+            lines.append(phase)
+            peak = max(counts.values())
+            for label, n in counts.items():
+                lines.append(f"  {label:>9s} {'█' * round(n / peak * 30):30s} {n}")
+        if summary.get("detail"):
+            lines += ["", summary["detail"]]
+        self.detail.configure(state="normal")
+        self.detail.delete("1.0", "end")
+        self.detail.insert("1.0", "\n".join(lines))
+        self.detail.configure(state="disabled")
 
 # ------------------ AutoTyperApp com categorias ------------------
 
+PROGRESS_FRAME_MS = 50  # intervalo em que o mainloop aplica o progresso do motor (~20 quadros/s)
+FILE_POLL_MS = 2000  # intervalo da verificação (os.stat) das sub-abas carregadas
+
+
 class AutoTyperApp(tb.Window):
     def __init__(self):
         super().__init__(themename="superhero")
         self.title("DIGITADOR DE ORDEM")
         self.geometry("640x780")
-        self.stop_event = threading.Event()
+        self.stop_event = RunControl()  # Parar e Pausar (também pelos atalhos globais, se disponíveis)
+        self._remove_hotkeys = None
+        self.progress_bus = ProgressBus()
+        self.run_tab = None
+        self.running = False
+        self.queue_holders = []
+        self.search_index = None  # SearchIndex, montado no primeiro uso da busca
+        self._search_pending = []  # sub-abas ainda carregando para o índice
+        self._search_hits = []
+        self.bulk_queue = None  # importação em lote em andamento
 
         # estrutura em memória para categorias
         self.categories = {}  # { "Categoria": [ {"name": subname, "file": "/abs/path.json"}, ... ] }
@@ -358,18 +724,17 @@ class AutoTyperApp(tb.Window):
 
         self._load_config()
         self._build_ui()
+        self.after(FILE_POLL_MS, self._poll_files)
+        self.bind("<Control-z>", lambda e: self._undo_redo(e, "undo"))
+        self.bind("<Control-y>", lambda e: self._undo_redo(e, "redo"))
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     # -------- Config load/save ----------
     def _load_config(self):
-        try:
-            with CONFIG_FILE.open("r", encoding="utf-8") as f:
-                self.categories = json.load(f)
-        except Exception:
-            self.categories = {}
+        self.categories = load_config(CONFIG_FILE)
 
     def _save_config(self):
-        with CONFIG_FILE.open("w", encoding="utf-8") as f:
-            json.dump(self.categories, f, ensure_ascii=False, indent=2)
+        save_config(self.categories, CONFIG_FILE)
 
     # -------- UI ----------
     def _build_ui(self):
@@ -380,10 +745,26 @@ class AutoTyperApp(tb.Window):
         tb.Button(top_ctrl, text="➕ Categoria", bootstyle="success", command=self._create_category).pack(side="left", padx=6)
         tb.Button(top_ctrl, text="✏️ Renomear", bootstyle="info", command=self._rename_category).pack(side="left", padx=6)
         tb.Button(top_ctrl, text="🗑️ Excluir", bootstyle="danger", command=self._delete_category).pack(side="left", padx=6)
+        tb.Button(top_ctrl, text="📦 Lote", bootstyle="info-outline", command=self._bulk_import).pack(side="left", padx=6)
+
+        # busca global por código/descrição em todas as sub-abas
+        self.search_var = tk.StringVar()
+        search_entry = tb.Entry(top_ctrl, textvariable=self.search_var, width=22)
+        search_entry.pack(side="right", padx=6)
+        search_entry.bind("<Return>", lambda e: self._open_search_hit(0))
+        tb.Label(top_ctrl, text="🔎").pack(side="right")
+        self.search_var.trace_add("write", lambda *a: self._search())
+        self.top_ctrl = top_ctrl
+        self.search_frame = tb.Frame(self)
+        self.search_results = tk.Listbox(self.search_frame, height=8, activestyle="none", font=("Consolas", 9))
+        self.search_results.pack(fill=X)
+        self.search_results.bind("<Double-Button-1>", lambda e: self._open_search_hit())
+        self.search_results.bind("<Return>", lambda e: self._open_search_hit())
 
         # Notebook principal de categorias
         self.cat_notebook = tb.Notebook(self)
         self.cat_notebook.pack(fill=BOTH, expand=False, padx=12, pady=(6,8))
+        self.cat_notebook.bind("<<NotebookTabChanged>>", lambda e: self._materialize_current())
 
         # para cada categoria carregada, cria uma aba
         for cat_name, tabs in self.categories.items():
@@ -399,10 +780,17 @@ class AutoTyperApp(tb.Window):
 
         tb.Button(ctrl, text="▶️ Iniciar", bootstyle="primary", command=self._start, width=18).pack(side="left", padx=6)
         tb.Button(ctrl, text="⏹ Parar", bootstyle="danger", command=self._stop, width=12).pack(side="left", padx=6)
+        self.pause_btn = tb.Button(ctrl, text="⏸ Pausar", bootstyle="warning-outline", command=self._toggle_pause, width=12)
+        self.pause_btn.pack(side="left", padx=6)
+        tb.Button(ctrl, text="⏯ Retomar", bootstyle="primary-outline", command=self._resume, width=12).pack(side="left", padx=6)
+        tb.Button(ctrl, text="🧾 Plano", bootstyle="secondary-outline", command=self._export_plan, width=10).pack(side="left", padx=6)
+        tb.Button(ctrl, text="📋 Fila", bootstyle="primary-outline", command=lambda: QueueDialog(self), width=10).pack(side="left", padx=6)
+        tb.Button(ctrl, text="📊 Métricas", bootstyle="secondary-outline", command=self._show_metrics, width=12).pack(side="left", padx=6)
 
         # Botão global de vidro
         self.glass_on = False
         def toggle_glass():
+            from vidro import disable_acrylic, enable_acrylic
             self.glass_on = not self.glass_on
             hwnd = self.winfo_id()
             if self.glass_on:
@@ -416,6 +804,10 @@ class AutoTyperApp(tb.Window):
         btn_glass = tb.Button(ctrl, text="Fixar: OFF", bootstyle="secondary", command=toggle_glass, width=14)
         btn_glass.pack(side="left", padx=6)
 
+        # modo rápido: item inteiro em uma sequência só, sem o PAUSE oculto do pyautogui
+        self.fast_mode = tk.BooleanVar(value=False)
+        tb.Checkbutton(ctrl, text="⚡ Rápido", variable=self.fast_mode, bootstyle="warning-round-toggle").pack(side="left", padx=6)
+
         # label de status grande
         self.status = tk.StringVar(value="Pronto")
         # ------ CAIXA DE INFORMAÇÃO DESTACADA ------
@@ -432,6 +824,11 @@ class AutoTyperApp(tb.Window):
         )
         self.status_label.pack(fill="x")
 
+        # progresso geral da fila de listas (só aparece durante uma fila)
+        self.queue_status = tk.StringVar(value="")
+        self.queue_frame = tb.Frame(self.status_frame, bootstyle="info")
+        tb.Label(self.queue_frame, textvariable=self.queue_status, anchor="center", font=("Segoe UI", 10)).pack(fill="x")
+
 
     # -------- Categoria: criação / renomear / excluir ----------
     def _create_category(self, name=None):
@@ -447,13 +844,7 @@ class AutoTyperApp(tb.Window):
 
         # inicializa com uma sub-aba vazia
         default_file = DATA_DIR / safe_filename(name.replace(" ", "_") + "_default")
-        default_file.parent.mkdir(parents=True, exist_ok=True)
-        if not default_file.exists():
-            default_file.write_text("[]", encoding="utf-8")
-
-        self.categories[name] = [
-            {"name": "Nova Aba", "file": str(default_file.resolve())}
-        ]
+        self.categories[name] = [self._new_entry("Nova Aba", default_file)]
         self._save_config()
         self._create_category_tab(name, self.categories[name], select=True)
 
@@ -467,17 +858,18 @@ class AutoTyperApp(tb.Window):
         tb.Button(hdr, text="➕ Sub", bootstyle="success", command=lambda c=cat_name: self._create_subtab(c)).pack(side="left", padx=6)
         tb.Button(hdr, text="✏️ Renomear Sub", bootstyle="info", command=lambda c=cat_name: self._rename_subtab(c)).pack(side="left", padx=6)
         tb.Button(hdr, text="🗑️ Excluir Sub", bootstyle="danger", command=lambda c=cat_name: self._delete_subtab(c)).pack(side="left", padx=6)
+        tb.Button(hdr, text="📎 Colar", bootstyle="secondary-outline", command=lambda c=cat_name: self._edit_paste(c)).pack(side="left", padx=6)
+        tb.Button(hdr, text="⌨️ Teclas", bootstyle="secondary-outline", command=lambda c=cat_name: self._edit_template(c)).pack(side="left", padx=6)
 
         # notebook interno de sub-abas
         sub_nb = tb.Notebook(frame)
         sub_nb.pack(fill=BOTH, expand=True, padx=8, pady=(6,8))
+        sub_nb.bind("<<NotebookTabChanged>>", lambda e: self._materialize_current())
         self.sub_notebooks[cat_name] = sub_nb
 
         # cria cada sub-aba
         for t in tabs:
-            name = t.get("name")
-            file = t.get("file")
-            self._add_subtab_to_notebook(cat_name, sub_nb, name, file)
+            self._add_subtab_to_notebook(cat_name, sub_nb, t)
 
         # adiciona ao notebook de categorias
         self.cat_notebook.add(frame, text=cat_name)
@@ -534,6 +926,9 @@ class AutoTyperApp(tb.Window):
         if not messagebox.askyesno("Confirmar", f"Excluir a categoria '{cat}' e suas sub-abas?"):
             return
         # remove da UI e da config
+        if self.search_index is not None and cat in self.sub_notebooks:
+            for tab_id in self.sub_notebooks[cat].tabs():
+                self.search_index.remove(self.sub_notebooks[cat].nametowidget(tab_id))
         frame = self.category_notebook_tabs.pop(cat)
         self.cat_notebook.forget(frame)
         self.sub_notebooks.pop(cat, None)
@@ -549,24 +944,218 @@ class AutoTyperApp(tb.Window):
         name = name.strip()
         # gera arquivo
         fname = safe_filename(f"{category}_{name}")
-        path = DATA_DIR / category
-        path.mkdir(parents=True, exist_ok=True)
-        file_path = path / fname
-        if not file_path.exists():
-            file_path.write_text("[]", encoding="utf-8")
+        entry = self._new_entry(name, DATA_DIR / category / fname)
         # registra na config
-        self.categories.setdefault(category, []).append({"name": name, "file": str(file_path.resolve())})
+        self.categories.setdefault(category, []).append(entry)
         self._save_config()
         # adiciona visualmente
         sub_nb = self.sub_notebooks.get(category)
         if sub_nb:
-            self._add_subtab_to_notebook(category, sub_nb, name, str(file_path.resolve()))
+            self._add_subtab_to_notebook(category, sub_nb, entry)
             # seleciona a nova aba
             sub_nb.select(sub_nb.index("end") - 1)
 
-    def _add_subtab_to_notebook(self, category, sub_nb, name, file):
-        tab_frame = TabFrame(sub_nb, name, Path(file))
-        sub_nb.add(tab_frame, text=name)
+    # -------- Importação em lote ----------
+    def _bulk_import(self):
+        if self.bulk_queue is not None:
+            messagebox.showwarning("Importação em lote", "Já existe uma importação em lote em andamento.")
+            return
+        paths = filedialog.askopenfilenames(
+            title="Selecione as planilhas (cada arquivo = categoria, cada aba = sub-aba)",
+            filetypes=[("Planilhas Excel", "*.xlsx *.xlsm *.xls")]
+        )
+        if not paths:
+            return
+        self.bulk_queue = q = queue.Queue()
+
+        def work():
+            try:
+                jobs = bulk_jobs(paths)
+                q.put(("progress", 0, len(jobs)))
+                q.put(("done", parse_parallel(jobs, on_progress=lambda n, total: q.put(("progress", n, total))), None))
+            except Exception as e:
+                q.put(("error", e, None))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.status.set("📦 Lendo planilhas...")
+        self.after(PROGRESS_FRAME_MS, self._poll_bulk_import)
+
+    def _poll_bulk_import(self):
+        finished = None
+        try:
+            while True:
+                kind, a, b = self.bulk_queue.get_nowait()
+                if kind == "progress":
+                    self.status.set(f"📦 Lendo planilhas: {a}/{b} abas")
+                else:
+                    finished = (kind, a)
+                    break
+        except queue.Empty:
+            pass
+        if finished is None:
+            self.after(PROGRESS_FRAME_MS, self._poll_bulk_import)
+            return
+        self.bulk_queue = None
+        kind, result = finished
+        if kind == "error":
+            self.status.set("Pronto")
+            messagebox.showerror("Importação em lote", f"Ocorreu um erro ao importar:\n{result}")
+            return
+        self._apply_bulk(result)
+
+    def _bulk_store(self, entry):
+        # usa o store da sub-aba já aberta, para a lista na tela acompanhar a gravação
+        for _cat, _sub_nb, holder in self._all_holders():
+            if holder.entry is entry:
+                store = holder.loaded_store()
+                if store is not None:
+                    return store
+        return open_store(entry)
+
+    def _apply_bulk(self, results):
+        known = set(self.categories)
+        summary, problems = apply_bulk(self.categories, results, get_store=self._bulk_store)
+        for category in self.categories:
+            if category not in known:
+                self._create_category_tab(category, self.categories[category], select=False)
+        lines, config_changed = [], False
+        for category, name, entry, created, added, updated, same in summary:
+            if created:
+                config_changed = True
+                if category in known and category in self.sub_notebooks:
+                    self._add_subtab_to_notebook(category, self.sub_notebooks[category], entry)
+            lines.append(f"{category} / {name}{' (nova)' if created else ''}: "
+                         f"{added} novos, {updated} atualizados, {same} iguais")
+        if config_changed:
+            self._save_config()
+        lines += [f"⚠️ {p}" for p in problems]
+        self.status.set(f"📦 {len(summary)} sub-aba(s) importada(s)")
+        messagebox.showinfo("Importação em lote", "\n".join(lines) or "Nenhuma linha válida encontrada.")
+
+    # -------- Recarga de arquivos alterados por fora ----------
+    def _poll_files(self):
+        # só as sub-abas já carregadas; as demais leem o arquivo atual quando forem abertas
+        if not self.running:
+            changed = []
+            for _cat, _sub_nb, holder in self._all_holders():
+                store = holder.loaded_store()
+                if store is None or (holder.tabframe is not None and holder.tabframe.import_cancel is not None):
+                    continue
+                try:
+                    if store.refresh():
+                        changed.append(holder.name)
+                except Exception:
+                    continue
+            if changed:
+                self.status.set(f"🔄 Alterado fora do programa, recarregado: {', '.join(changed)}")
+        self.after(FILE_POLL_MS, self._poll_files)
+
+    def _undo_redo(self, event, action):
+        # numa caixa de texto o atalho fica com ela; fora, desfaz/refaz na sub-aba visível
+        if event.widget.winfo_class() in ("Entry", "TEntry", "Text") or self.running:
+            return
+        holder, _ = self._current_holder()
+        if holder is not None and holder.tabframe is not None:
+            getattr(holder.tabframe, action)()
+
+    def _on_close(self):
+        # compacta os logs de operações (JSON regravado inteiro) antes de sair
+        for _cat, _sub_nb, holder in self._all_holders():
+            store = holder.loaded_store()
+            if store is not None:
+                try:
+                    store.compact()
+                except Exception:
+                    pass
+        self.destroy()
+
+    # -------- Busca global ----------
+    def _all_holders(self):
+        for cat, sub_nb in self.sub_notebooks.items():
+            for tab_id in sub_nb.tabs():
+                yield cat, sub_nb, sub_nb.nametowidget(tab_id)
+
+    def _index_holder(self, holder):
+        holder.preload()
+        self._search_pending.append(holder)
+        if len(self._search_pending) == 1:
+            self.after(PROGRESS_FRAME_MS, self._poll_search_index)
+
+    def _poll_search_index(self):
+        # entra no índice cada sub-aba cuja pré-carga terminou
+        waiting = []
+        for holder in self._search_pending:
+            store = holder.loaded_store()
+            if store is not None:
+                self.search_index.add(holder, store)
+            elif holder.loading():
+                waiting.append(holder)
+        self._search_pending = waiting
+        if waiting:
+            self.after(PROGRESS_FRAME_MS, self._poll_search_index)
+        self._search()
+
+    def _search(self):
+        query = self.search_var.get().strip()
+        if not query:
+            self.search_frame.pack_forget()
+            return
+        if self.search_index is None:
+            # primeiro uso: carrega em segundo plano as sub-abas ainda não abertas
+            self.search_index = SearchIndex()
+            for _, _, holder in self._all_holders():
+                self._index_holder(holder)
+        labels = {holder: f"{cat} / {sub_nb.tab(holder, 'text')}" for cat, sub_nb, holder in self._all_holders()}
+        self._search_hits = [h for h in self.search_index.search(query) if h.key in labels]
+        lb = self.search_results
+        lb.delete(0, "end")
+        for hit in self._search_hits:
+            lb.insert("end", f"{hit.codigo:>10}  {hit.nome[:28]:28}  {labels[hit.key]}")
+        if not self._search_hits:
+            lb.insert("end", "indexando..." if self._search_pending else "nenhum resultado")
+        self.search_frame.pack(fill=X, padx=12, pady=(0, 4), after=self.top_ctrl)
+
+    def _open_search_hit(self, pos=None):
+        if pos is None:
+            sel = self.search_results.curselection()
+            if not sel:
+                return
+            pos = sel[0]
+        if pos >= len(self._search_hits):
+            return
+        hit = self._search_hits[pos]
+        for cat, sub_nb, holder in self._all_holders():
+            if holder is hit.key:
+                self.cat_notebook.select(self.category_notebook_tabs[cat])
+                sub_nb.select(holder)
+                tabframe = holder.ensure()
+                tabframe.filter_var.set("")  # o item pode estar escondido pelo filtro da sub-aba
+                tabframe.scroll_to(hit.idx)
+                if not self.running:
+                    tabframe.highlight_card(hit.idx, "active")
+                    self.after(1500, lambda: tabframe.highlight_card(hit.idx, None))
+                return
+
+    def _new_entry(self, name, file_path):
+        return new_entry(self.categories, name, file_path)
+
+    def _add_subtab_to_notebook(self, category, sub_nb, entry):
+        holder = LazySubTab(sub_nb, entry.get("name"), entry)
+        sub_nb.add(holder, text=entry.get("name"))
+        if self.search_index is not None:
+            self._index_holder(holder)
+
+    def _materialize_current(self):
+        # cria o TabFrame só da sub-aba visível e pré-carrega o JSON das vizinhas em segundo plano
+        holder, sub_nb = self._current_holder()
+        if holder is None:
+            return
+        holder.ensure()
+        tabs = sub_nb.tabs()
+        idx = sub_nb.index(holder)
+        for j in (idx - 1, idx + 1):
+            if 0 <= j < len(tabs):
+                sub_nb.nametowidget(tabs[j]).preload()
 
     def _rename_subtab(self, category):
         sub_nb = self.sub_notebooks.get(category)
@@ -603,63 +1192,184 @@ class AutoTyperApp(tb.Window):
 
         idx = sub_nb.index(cur)
         name = sub_nb.tab(idx, "text")
+        holder = sub_nb.nametowidget(cur)
 
         if not messagebox.askyesno("Confirmar", f"Excluir a sub-aba '{name}' da categoria '{category}'?\n\n⚠ Isso também irá apagar o arquivo JSON correspondente."):
             return
 
         # ---- REMOVE DA CONFIG ----
         entries = self.categories.get(category, [])
-        removed_file = None
+        removed = None
 
         new_entries = []
         for e in entries:
             if e.get("name") == name:
-                removed_file = e.get("file")
+                removed = e
             else:
                 new_entries.append(e)
 
         self.categories[category] = new_entries
         self._save_config()
 
-        # ---- EXCLUI O ARQUIVO JSON ----
-        if removed_file:
+        # ---- EXCLUI O ARQUIVO JSON (ou as linhas no banco) ----
+        if removed:
             try:
-                p = Path(removed_file)
-                if p.exists():
-                    p.unlink()  # REMOVE O ARQUIVO
+                delete_tab_data(removed)
             except Exception as e:
-                messagebox.showwarning("Erro", f"Não foi possível remover o arquivo JSON:\n{e}")
+                messagebox.showwarning("Erro", f"Não foi possível remover os dados da sub-aba:\n{e}")
 
         # ---- REMOVE A ABA VISUALMENTE ----
         sub_nb.forget(idx)
+        if self.search_index is not None:
+            self.search_index.remove(holder)
+
+
+    def _selected_entry(self, category):
+        # (nome, entrada da config) da sub-aba selecionada na categoria, ou (None, None)
+        sub_nb = self.sub_notebooks.get(category)
+        cur = sub_nb.select() if sub_nb else None
+        if not cur:
+            return None, None
+        name = sub_nb.tab(cur, "text")
+        return name, find_subtab(self.categories, category, name)
+
+    def _edit_paste(self, category):
+        # escolhe quais campos da sub-aba selecionada são colados (Ctrl+V) em vez de digitados
+        name, entry = self._selected_entry(category)
+        if entry is None:
+            return
+        current = paste_fields(entry)
+        win = tb.Toplevel(title=f"Entrada — {name}")
+        tb.Label(win, text="Colar pela área de transferência em vez de digitar:").pack(anchor="w", padx=10, pady=(10, 4))
+        fields = {}
+        for field, label in (("codigo", "Código"), ("quantidade", "Quantidade")):
+            fields[field] = tk.BooleanVar(value=field in current)
+            tb.Checkbutton(win, text=label, variable=fields[field], bootstyle="round-toggle").pack(anchor="w", padx=20, pady=2)
+        tb.Label(win, text="Deixe desmarcado o campo que não aceita colar: ele continua sendo digitado.",
+                 font=("Segoe UI", 8, "italic")).pack(anchor="w", padx=10, pady=(6, 0))
+
+        def salvar():
+            chosen = [f for f, var in fields.items() if var.get()]
+            if chosen:
+                entry["paste"] = chosen
+            else:
+                entry.pop("paste", None)
+            self._save_config()
+            win.destroy()
 
+        tb.Button(win, text="Salvar", bootstyle="primary", command=salvar).pack(anchor="e", padx=10, pady=10)
+
+    def _edit_template(self, category):
+        # modelo de navegação da sub-aba selecionada: o caminho de teclas de cada item nesta tela
+        name, entry = self._selected_entry(category)
+        if entry is None:
+            return
+        win = tb.Toplevel(title=f"Teclas — {name}")
+        tb.Label(win, text="Sequência de cada item (separada por espaço):").pack(anchor="w", padx=10, pady=(10, 4))
+        var = tk.StringVar(value=nav_template(entry) or DEFAULT_TEMPLATE)
+        tb.Entry(win, textvariable=var, width=60).pack(fill=X, padx=10)
+        tb.Label(win, text="{codigo} {quantidade} {nome} = campos do item; {timer} = onde esperar o tempo do item\n"
+                           "enter, tab, right, down, f2... = teclas; right*4 = repetir; wait:0,5 = esperar (s)",
+                 font=("Segoe UI", 8, "italic"), justify="left").pack(anchor="w", padx=10, pady=(6, 0))
+
+        def salvar():
+            text = " ".join(var.get().split())
+            load_pyautogui()  # carregado sob demanda: sem ele os nomes das teclas não são conferidos
+            try:
+                parse_template(text)
+            except ValueError as e:
+                messagebox.showerror("Modelo de navegação", f"Modelo inválido: {e}", parent=win)
+                return
+            if text and text != DEFAULT_TEMPLATE:
+                entry["template"] = text
+            else:
+                entry.pop("template", None)
+            self._save_config()
+            win.destroy()
+
+        bottom = tb.Frame(win)
+        bottom.pack(fill=X, padx=10, pady=10)
+        tb.Button(bottom, text="Padrão", bootstyle="secondary-outline", command=lambda: var.set(DEFAULT_TEMPLATE)).pack(side="left")
+        tb.Button(bottom, text="Salvar", bootstyle="primary", command=salvar).pack(side="right")
 
     # -------- utilitário para pegar TabFrame atual ----------
-    def _current_tabframe(self):
-        # retorna o TabFrame atualmente visível (sub-aba selecionada na categoria selecionada)
+    def _current_holder(self):
+        # retorna (LazySubTab, notebook) da sub-aba selecionada na categoria selecionada
         cat_sel = self.cat_notebook.select()
         if not cat_sel:
-            return None
+            return None, None
         # encontra categoria
         for cat_name, frame in self.category_notebook_tabs.items():
             if str(frame) == str(cat_sel):
                 sub_nb = self.sub_notebooks.get(cat_name)
                 if not sub_nb:
-                    return None
+                    return None, None
                 cur = sub_nb.select()
                 if not cur:
-                    return None
-                # cur é o widget path; procuramos seu objeto TabFrame
-                for child in sub_nb.winfo_children():
-                    if str(child) == str(cur):
-                        return child  # esse child é um TabFrame
-                # fallback: tab index mapping
-                return None
+                    return None, None
+                return sub_nb.nametowidget(cur), sub_nb
+        return None, None
+
+    def _current_entry(self):
+        # entrada da config ({"name", "file", ...}) da sub-aba selecionada
+        holder, sub_nb = self._current_holder()
+        if holder is None:
+            return None
+        for cat_name, nb in self.sub_notebooks.items():
+            if nb is sub_nb:
+                return find_subtab(self.categories, cat_name, sub_nb.tab(holder, "text"))
         return None
 
+    def _current_tabframe(self):
+        # retorna o TabFrame atualmente visível (criando-o se a sub-aba ainda não foi aberta)
+        holder, _ = self._current_holder()
+        if holder is None:
+            return None
+        return holder.ensure()
+
     # -------- Start / Stop / Worker (reaproveitado, agora usa _current_tabframe) ----------
-    def _start(self):
-        if pyautogui is None:
+    def _export_plan(self):
+        # dry run: grava o plano de teclas da sub-aba atual e mostra a duração estimada
+        tabframe = self._current_tabframe()
+        if tabframe is None or not tabframe.get_items():
+            messagebox.showwarning("Aviso", "Selecione uma sub-aba com itens.")
+            return
+        pacing = Pacing.fast() if self.fast_mode.get() else Pacing()
+        entry = self._current_entry()
+        try:
+            plan = compile_plan(tabframe.get_items(), pacing, paste=paste_fields(entry), template=nav_template(entry))
+        except ValueError as e:
+            messagebox.showerror("Modelo de navegação", f"Modelo de navegação inválido: {e}")
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Exportar plano (dry run)",
+            defaultextension=".txt",
+            initialfile=f"plano_{tabframe.json_path.stem}.txt",
+            filetypes=[("Texto", "*.txt")]
+        )
+        if not file_path:
+            return
+        Path(file_path).write_text(plan.to_text(), encoding="utf-8")
+        problems = plan.check()
+        msg = f"{len(plan)} itens, {len(plan.ops)} operações.\nDuração estimada: {format_eta(plan.duration)}"
+        if problems:
+            msg += "\n\nProblemas:\n" + "\n".join(problems[:10])
+        messagebox.showinfo("Plano exportado", msg)
+
+    def _show_metrics(self):
+        tabframe = self._current_tabframe()
+        if tabframe is None:
+            messagebox.showwarning("Aviso", "Selecione uma sub-aba.")
+            return
+        MetricsDialog(self, tabframe)
+
+    def _resume(self):
+        self._start(resume=True)
+
+    def _start(self, resume=False):
+        if self.running:
+            return
+        if load_pyautogui() is None:
             messagebox.showerror("Erro", "pyautogui não está instalado. Rode: pip install pyautogui")
             return
         tabframe = self._current_tabframe()
@@ -670,99 +1380,225 @@ class AutoTyperApp(tb.Window):
         if not items:
             messagebox.showwarning("Aviso", "Lista vazia para a aba selecionada.")
             return
+        errors = tabframe.store.errors()
+        if errors:
+            linhas = "\n".join(f"Linha {i+1} ({items[i].codigo}): {msg}" for i, msg in errors[:10])
+            if len(errors) > 10:
+                linhas += f"\n... e mais {len(errors) - 10}"
+            tabframe.scroll_to(errors[0][0])
+            messagebox.showerror("Itens inválidos", f"Corrija as linhas abaixo antes de iniciar:\n\n{linhas}")
+            return
+        if not self._confirm_duplicates(tabframe):
+            return
 
-        self.stop_event.clear()
-        
-        self.status.set("Iniciando em 4 segundos... Posicione o cursor no campo alvo.")
-        threading.Thread(target=self._worker, args=(tabframe, items), daemon=True).start()
-
-    def _stop(self):
-        self.stop_event.set()
-        self.status.set("Parando...")
+        # execução interrompida desta mesma lista? (diário append-only da sub-aba)
+        journal = RunJournal(tabframe.json_path)
+        start_at = journal.resume_point(items_hash(items))
+        if resume:
+            if start_at is None:
+                messagebox.showinfo("Retomar", "Nenhuma execução interrompida para retomar nesta lista.")
+                return
+            resp = simpledialog.askinteger(
+                "Retomar", f"Retomar a partir de qual item? (1 a {len(items)})",
+                initialvalue=start_at + 1, minvalue=1, maxvalue=len(items), parent=self
+            )
+            if resp is None:
+                return
+            start_at = resp - 1
+        elif start_at is not None:
+            resp = messagebox.askyesnocancel(
+                "Execução interrompida",
+                f"A última execução desta lista parou no item {start_at+1} ({items[start_at].codigo}).\n\n"
+                "Sim: retomar de lá\nNão: começar do primeiro item"
+            )
+            if resp is None:
+                return
+            if not resp:
+                start_at = 0
+        else:
+            start_at = 0
 
-    def _worker(self, tab: TabFrame, items):
-        # Delay pra dar tempo de foco
-        time.sleep(4)
-        pyautogui.FAILSAFE = True
+        pacing = Pacing.fast() if self.fast_mode.get() else Pacing()
+        entry = self._current_entry()
         try:
-            for idx, item in enumerate(items):
-                if len(item) == 4:
-                    codigo, nome, qtd, timer = item
-                else:
-                    codigo, nome, qtd = item
-                    timer = 1  # padrão caso não exista no JSON
-
-                if self.stop_event.is_set():
-                    self.status.set("Parado pelo usuário.")
-                    break
-                self.status.set(f"[{idx+1}/{len(items)}] Digitando: {codigo} (Qtd: {qtd})")
-
-                # UI feedback: scroll e destaque
-                try:
-                    self.after(0, lambda i=idx: tab.scroll_to(i))
-                except Exception:
-                    pass
-
-                # 1) digitar o código
-                pyautogui.typewrite(str(codigo))
-                time.sleep(0.06)
-
-                # 2) apertar ENTER
-                pyautogui.press("enter")
-                time.sleep(0.08)
-
-                # 3) seta para a direita 4x
-                for _ in range(4):
-                    pyautogui.press("right")
-                    time.sleep(0.04)
-
-                # 4) apertar ENTER
-                pyautogui.press("enter")
-                time.sleep(0.08)
-
-                # 5) digitar quantidade
-                pyautogui.typewrite(str(qtd))
-
-                # 🔄 timer visual em tempo real
-                t = float(timer)
-                # mudar visual do status_label para warning enquanto aguarda (thread-safe via after)
-                self.after(0, lambda: self.status_label.configure(bootstyle="warning"))
-
-                if t > 0:
-                    elapsed = 0
-                    step = 0.1  # atualização a cada 100ms
-                    while elapsed < t:
-                        if self.stop_event.is_set():
-                            return
-                        restante = round(t - elapsed, 1)
-                        self.status.set(f"[{idx+1}/{len(items)}] Digitando: {codigo} (Qtd: {qtd}) | Aguardando: {restante}s")
-                        time.sleep(step)
-                        elapsed += step
+            plan = compile_plan(items, pacing, start_at, paste_fields(entry), nav_template(entry))
+        except ValueError as e:
+            messagebox.showerror("Modelo de navegação", f"Modelo de navegação inválido: {e}")
+            return
+        self.status.set(f"Iniciando em 4 segundos... Posicione o cursor no campo alvo. (duração estimada {format_eta(plan.duration)})")
+        self.run_tab = tabframe
+        self._begin_run()
+        engine = TypingEngine(stop_event=self.stop_event, pacing=pacing, on_event=self.progress_bus.publish, journal=journal,
+                              metrics=RunMetrics(tabframe.json_path, tabframe.name))
+        threading.Thread(target=self._worker, args=(lambda: engine.run_plan(plan),), daemon=True).start()
+        self.after(PROGRESS_FRAME_MS, self._drain_progress)
+
+    def _category_stores(self, category):
+        # {nome: CodeStore} das sub-abas da categoria; as ainda não abertas são lidas só para a conferência
+        stores = {}
+        sub_nb = self.sub_notebooks.get(category)
+        for tab_id in sub_nb.tabs() if sub_nb else ():
+            holder = sub_nb.nametowidget(tab_id)
+            stores[sub_nb.tab(holder, "text")] = holder.loaded_store() or open_store(holder.entry)
+        return stores
+
+    def _confirm_duplicates(self, tabframe):
+        # antes de digitar: códigos repetidos na própria lista ou em outra sub-aba da mesma categoria
+        lines = [f"{codigo}: {len(pos)}× nesta lista (linhas {', '.join(str(i + 1) for i in pos[:5])})"
+                 for codigo, pos in tabframe.store.duplicates().items()]
+        for cat, sub_nb, holder in self._all_holders():
+            if holder.tabframe is tabframe:
+                name = sub_nb.tab(holder, "text")
+                for codigo, names in code_conflicts(self._category_stores(cat)).items():
+                    if name in names:
+                        lines.append(f"{codigo}: também em {', '.join(n for n in names if n != name)}")
+                break
+        if not lines:
+            return True
+        text = "\n".join(lines[:15])
+        if len(lines) > 15:
+            text += f"\n... e mais {len(lines) - 15}"
+        return messagebox.askyesno("Códigos repetidos", f"Códigos repetidos encontrados:\n\n{text}\n\nIniciar mesmo assim?")
+
+    def _find_holder(self, path):
+        # LazySubTab aberto para esse arquivo, se houver
+        path = Path(path).resolve()
+        for sub_nb in self.sub_notebooks.values():
+            for tab_id in sub_nb.tabs():
+                holder = sub_nb.nametowidget(tab_id)
+                if holder.json_path.resolve() == path:
+                    return holder
+        return None
 
-                # volta a aparência normal
-                self.after(0, lambda: self.status_label.configure(bootstyle="info"))
+    def _start_queue(self, pairs, between):
+        """Roda várias sub-abas (categoria, nome) em sequência numa sessão só."""
+        if self.running:
+            return False
+        if load_pyautogui() is None:
+            messagebox.showerror("Erro", "pyautogui não está instalado. Rode: pip install pyautogui")
+            return False
+        entries, holders, problems = [], [], []
+        for cat, name in pairs:
+            entry = find_subtab(self.categories, cat, name)
+            if entry is None:
+                problems.append(f"{cat} / {name}: sub-aba não encontrada")
+                continue
+            path = resolve_tab_file(entry)
+            holder = self._find_holder(path)
+            store = holder.tabframe.store if holder is not None and holder.tabframe is not None else open_store(entry)
+            items = store.get_all()
+            if not items:
+                problems.append(f"{cat} / {name}: lista vazia")
+            elif store.errors():
+                problems.append(f"{cat} / {name}: {len(store.errors())} linha(s) inválida(s)")
+            try:
+                parse_template(nav_template(entry))
+            except ValueError as e:
+                problems.append(f"{cat} / {name}: modelo de navegação inválido: {e}")
+            label = f"{cat} / {name}"
+            entries.append(QueueEntry(label, items, journal=RunJournal(path), metrics=RunMetrics(path, label),
+                                      paste=paste_fields(entry), template=nav_template(entry)))
+            holders.append(holder)
+        if problems:
+            messagebox.showerror("Fila", "Corrija antes de iniciar:\n\n" + "\n".join(problems))
+            return False
+
+        pacing = Pacing.fast() if self.fast_mode.get() else Pacing()
+        runner = QueueRunner(entries, between, stop_event=self.stop_event, pacing=pacing, on_event=self.progress_bus.publish)
+        self.status.set("Iniciando fila em 4 segundos... Posicione o cursor no campo alvo.")
+        self.queue_status.set(f"{len(entries)} listas, {sum(len(e.items) for e in entries)} itens — duração estimada {format_eta(runner.duration)}")
+        self.queue_frame.pack(fill="x", pady=(6,0))
+        self.queue_holders = holders
+        self.run_tab = None
+        self._begin_run()
+        threading.Thread(target=self._worker, args=(runner.run,), daemon=True).start()
+        self.after(PROGRESS_FRAME_MS, self._drain_progress)
+        return True
+
+    def _begin_run(self):
+        self.stop_event.reset()
+        self.running = True
+        self.pause_btn.configure(text="⏸ Pausar")
+        self._remove_hotkeys = install_hotkeys(self.stop_event)
+
+    def _end_run(self):
+        self.running = False
+        if self._remove_hotkeys is not None:
+            self._remove_hotkeys()
+            self._remove_hotkeys = None
+        self.pause_btn.configure(text="⏸ Pausar")
 
-                # 6) seta para baixo
-                pyautogui.press("down")
-                time.sleep(0.5)
+    def _stop(self):
+        self.stop_event.set()
+        self.status.set("Parando...")
 
-                # visual: destacar card (não remove cor depois)
-                self.after(0, lambda i=idx: tab.highlight_card(i, style="done"))
+    def _toggle_pause(self):
+        if not self.running:
+            return
+        if self.stop_event.toggle_pause():
+            self.status.set("⏸ Pausa pedida: o item atual termina e a digitação para"
+                            + (f" ({PAUSE_HOTKEY} continua, {STOP_HOTKEY} para)" if self._remove_hotkeys else ""))
+        else:
+            self.status.set("Continuando...")
+        self._sync_pause_button()
 
-                # pequeno intervalo entre itens (ajustável)
-                time.sleep(0.18)
+    def _sync_pause_button(self):
+        # a pausa também pode vir do atalho global, em outra thread
+        paused = self.stop_event.paused
+        self.pause_btn.configure(text="▶ Continuar" if paused else "⏸ Pausar")
 
-            else:
-                # loop completo sem break
-                self.status.set("✅ Concluído com sucesso.")
-        except pyautogui.FailSafeException:
-            self.status.set("Abortado: Fail-safe acionado (mova o mouse para um canto).")
+    def _worker(self, run):
+        # roda fora do mainloop: o motor só publica eventos no bus, nunca toca nos widgets
+        try:
+            run()
         except Exception as e:
-            self.status.set(f"Erro durante execução: {e}")
-        finally:
-            self.stop_event.clear()
-
+            self.progress_bus.publish(make_event("run_finished", outcome="error", message=f"Erro durante execução: {e}"))
+
+    def _drain_progress(self):
+        # aplicado no mainloop a cada PROGRESS_FRAME_MS; só o estado mais recente é desenhado
+        events = self.progress_bus.drain()
+        scroll = None
+        status_events = []
+        for ev in events:
+            tab = self.run_tab
+            if ev.kind == "list_started":
+                # fila: cards só são destacados se a sub-aba da lista já foi aberta
+                holder = self.queue_holders[ev.idx]
+                self.run_tab = holder.tabframe if holder is not None else None
+                status_events.append(ev)
+            elif ev.kind == "queue_progress":
+                self.queue_status.set(format_event(ev))
+            elif ev.kind == "list_finished":
+                pass
+            else:
+                status_events.append(ev)
+                if tab is None:
+                    pass
+                elif ev.kind == "item_started":
+                    scroll = (tab, ev.idx)
+                elif ev.kind == "item_done":
+                    tab.highlight_card(ev.idx, style="done")
+                elif ev.kind == "item_failed" and ev.idx >= 0:
+                    tab.highlight_card(ev.idx, style="err")
+            if ev.kind == "run_finished":
+                self._end_run()
+                self.queue_frame.pack_forget()
+        if scroll is not None:
+            scroll[0].scroll_to(scroll[1])
+        if status_events:
+            last = status_events[-1]
+            waiting = last.kind == "countdown" and last.remaining > 0
+            # visual do status_label em warning enquanto aguarda o timer do item
+            self.status_label.configure(bootstyle="warning" if waiting else "info")
+            text = format_event(last)
+            if text:
+                self.status.set(text)
+        if self.running:
+            self._sync_pause_button()
+            self.after(PROGRESS_FRAME_MS, self._drain_progress)
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # executável empacotado: os processos da importação em lote
     app = AutoTyperApp()
     app.mainloop()
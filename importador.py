@@ -0,0 +1,219 @@
+# importador.py
+"""
+importador.py
+Leitura de planilhas para as sub-abas, sem depender de Tk.
+- .xlsx em modo streaming (openpyxl read_only), .xls via xlrd
+- Colunas (sem cabeçalho): Código, Item (descrição), Quantidade, Tempo (opcional, padrão 1s)
+- As linhas saem em blocos (chunks) para serem gravadas no CodeStore aos poucos
+- Importação em lote (bulk_jobs/parse_parallel/apply_bulk): pasta ou planilha com várias abas,
+  lidas em paralelo num pool de processos; cada arquivo = categoria, cada aba = sub-aba
+"""
+
+import os
+from collections import namedtuple
+from pathlib import Path
+
+from armazenamento import format_number
+
+CHUNK_SIZE = 500
+BULK_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+
+BulkJob = namedtuple("BulkJob", "path sheet category tab")
+
+
+class ImportCancelled(Exception):
+    """Importação interrompida pelo usuário."""
+
+
+def _cell_text(value):
+    # células numéricas inteiras vêm como float (ex.: 111002.0 no .xls); None vira vazio
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _cell_number(value):
+    # célula numérica com casas vira texto com DECIMAL_SEP ("0,125"): com "." o parse_number
+    # leria 0.125/12.345 como milhar
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return format_number(value)
+    return _cell_text(value)
+
+
+def parse_row(row):
+    """Converte uma linha da planilha em (codigo, nome, qtd, timer), ou None se não for válida.
+
+    >>> parse_row(("111002", "Parafuso", 0.125, 12.345))
+    ('111002', 'Parafuso', '0,125', '12,345')
+    """
+    if not row or len(row) < 3:
+        return None
+    codigo = _cell_text(row[0])
+    if not codigo:
+        return None
+    nome = _cell_text(row[1])
+    qtd = _cell_number(row[2])
+    timer = _cell_number(row[3]) if len(row) > 3 else ""
+    return (codigo, nome, qtd, timer or "1")
+
+
+def _open_xls(path):
+    try:
+        import xlrd
+    except ImportError:
+        raise RuntimeError("Para ler arquivos .xls instale o xlrd: pip install xlrd")
+    return xlrd.open_workbook(str(path), on_demand=True)
+
+
+def open_rows(file_path, sheet=None):
+    """Abre a planilha e retorna (total_de_linhas_ou_None, iterador de linhas, fechar).
+    sheet: nome da aba (padrão: a ativa no .xlsx, a primeira no .xls)."""
+    path = Path(file_path)
+    if path.suffix.lower() == ".xls":
+        book = _open_xls(path)
+        ws = book.sheet_by_index(0) if sheet is None else book.sheet_by_name(sheet)
+        rows = (ws.row_values(i) for i in range(ws.nrows))
+        return ws.nrows, rows, book.release_resources
+
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    ws = wb.active if sheet is None else wb[sheet]
+    return ws.max_row, ws.iter_rows(values_only=True), wb.close
+
+
+def sheet_names(file_path):
+    """Nomes das abas da planilha, na ordem do arquivo."""
+    path = Path(file_path)
+    if path.suffix.lower() == ".xls":
+        book = _open_xls(path)
+        try:
+            return book.sheet_names()
+        finally:
+            book.release_resources()
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def iter_item_chunks(file_path, chunk_size=CHUNK_SIZE, cancel_event=None, on_progress=None, sheet=None):
+    """Gera listas de até chunk_size itens válidos.
+
+    on_progress(linhas_lidas, total_ou_None) é chamado a cada bloco; se cancel_event for setado,
+    levanta ImportCancelled antes do próximo bloco.
+    """
+    total, rows, close = open_rows(file_path, sheet)
+    try:
+        chunk = []
+        read = 0
+        for row in rows:
+            read += 1
+            item = parse_row(row)
+            if item:
+                chunk.append(item)
+            if read % chunk_size == 0:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ImportCancelled()
+                if on_progress:
+                    on_progress(read, total)
+                if chunk:
+                    yield chunk
+                    chunk = []
+        if cancel_event is not None and cancel_event.is_set():
+            raise ImportCancelled()
+        if on_progress:
+            on_progress(read, total)
+        if chunk:
+            yield chunk
+    finally:
+        close()
+
+
+# ------------------ Importação em lote ------------------
+
+def bulk_jobs(paths, category=None):
+    """Abas a importar. Cada arquivo vira uma categoria (nome do arquivo, ou category para todos) e cada
+    aba da planilha uma sub-aba com o nome da aba. Pastas entram com as planilhas de dentro (sem subpastas)."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files += sorted(f for f in path.iterdir()
+                            if f.suffix.lower() in BULK_SUFFIXES and not f.name.startswith("~$"))
+        else:
+            files.append(path)
+    return [BulkJob(str(f), sheet, category or f.stem, sheet) for f in files for sheet in sheet_names(f)]
+
+
+def read_sheet(file_path, sheet=None):
+    """Todos os itens válidos de uma aba."""
+    return [item for chunk in iter_item_chunks(file_path, sheet=sheet) for item in chunk]
+
+
+def _parse_job(job):
+    # roda num processo do pool: só tuplas e textos entram e saem
+    try:
+        return read_sheet(job.path, job.sheet), None
+    except Exception as e:
+        return [], str(e)
+
+
+def parse_parallel(jobs, workers=None, on_progress=None, cancel_event=None):
+    """Lê as abas em paralelo (um processo por núcleo, no máximo um por aba).
+
+    Retorna [(job, itens, erro_ou_None)] na ordem de jobs. on_progress(lidas, total) a cada aba lida;
+    com cancel_event setado, as abas que ainda não começaram são descartadas e ImportCancelled sobe.
+    """
+    workers = max(1, min(len(jobs), workers or os.cpu_count() or 1))
+    results = [None] * len(jobs)
+
+    def done(i, result, count):
+        results[i] = result
+        if on_progress:
+            on_progress(count, len(jobs))
+        if cancel_event is not None and cancel_event.is_set():
+            raise ImportCancelled()
+
+    if workers == 1:
+        # uma aba só (ou um núcleo): sem o custo de subir processos
+        for i, job in enumerate(jobs):
+            done(i, _parse_job(job), i + 1)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_parse_job, job): i for i, job in enumerate(jobs)}
+            try:
+                for count, future in enumerate(as_completed(futures), 1):
+                    done(futures[future], future.result(), count)
+            except ImportCancelled:
+                for future in futures:
+                    future.cancel()
+                raise
+    return [(job, items, error) for job, (items, error) in zip(jobs, results)]
+
+
+def apply_bulk(categories, results, get_store=None):
+    """Grava o que parse_parallel leu: cria na config (em memória) as categorias/sub-abas que faltam e
+    faz um upsert_many por sub-aba (abas que caem na mesma sub-aba são juntadas: uma gravação cada).
+
+    get_store(entry) devolve o CodeStore da sub-aba (padrão: open_store; a interface passa o já aberto).
+    Retorna ([(categoria, sub-aba, entry, criada, novos, atualizados, iguais)], [problemas]);
+    quem chama grava a config.
+    """
+    from armazenamento import ensure_subtab, open_store
+    get_store = get_store or open_store
+    targets, problems = {}, []
+    for job, items, error in results:
+        if error:
+            problems.append(f"{Path(job.path).name} / {job.sheet}: {error}")
+        elif items:
+            targets.setdefault((job.category.strip(), job.tab.strip()), []).extend(items)
+    summary = []
+    for (category, tab), items in targets.items():
+        category, entry, created = ensure_subtab(categories, category, tab)
+        added, updated, same = get_store(entry).upsert_many(items)
+        summary.append((category, entry["name"], entry, created, added, updated, same))
+    return summary, problems
@@ -0,0 +1,167 @@
+# metricas.py
+"""
+metricas.py
+Métricas por execução: tempo de cada fase de cada item, itens/minuto e motivo de parada.
+- O motor marca o início de cada fase (codigo, navegacao, quantidade, timer, intervalo)
+- Ao terminar, grava data/metrics/<subaba>_<execução>.jsonl (uma linha por item + resumo) e .csv
+- summarize()/histogram() alimentam o painel de métricas da janela
+"""
+
+import csv
+import json
+import statistics
+import time
+from pathlib import Path
+
+from armazenamento import DATA_DIR
+
+METRICS_DIR = DATA_DIR / "metrics"
+PHASES = ("codigo", "navegacao", "quantidade", "timer", "intervalo")
+# limites (ms) das faixas do histograma; a última faixa é "acima do último limite"
+HISTOGRAM_EDGES_MS = (25, 50, 100, 200, 400, 800, 1600, 3200)
+
+
+class RunMetrics:
+    """Coleta os tempos de uma execução. mark() é chamado pelo motor a cada troca de fase."""
+    def __init__(self, store_path, label="", metrics_dir=None):
+        self.store_path = Path(store_path)
+        self.label = label or self.store_path.stem
+        self.dir = Path(metrics_dir or METRICS_DIR)
+        self.rows = {}  # idx -> {"idx", "item": código, fase: segundos}
+        self.started = None
+        self.mode = ""
+        self.t0 = None
+        self._current = None  # (idx, fase, instante)
+        self.summary = None
+
+    def start(self, mode):
+        self.started = time.time()
+        self.mode = mode
+        self.t0 = time.perf_counter()
+
+    def mark(self, idx, codigo, phase, now=None):
+        now = time.perf_counter() if now is None else now
+        self._close(now)
+        if idx not in self.rows:
+            self.rows[idx] = {"idx": idx, "item": codigo}
+        self._current = (idx, phase, now)
+
+    def _close(self, now):
+        if self._current is not None:
+            idx, phase, since = self._current
+            row = self.rows[idx]
+            row[phase] = row.get(phase, 0.0) + (now - since)
+            self._current = None
+
+    def finish(self, outcome, detail="", done=0):
+        """Fecha a execução, calcula o resumo e grava os arquivos. Retorna o resumo."""
+        now = time.perf_counter()
+        self._close(now)
+        elapsed = now - self.t0 if self.t0 is not None else 0.0
+        rows = [self.rows[i] for i in sorted(self.rows)]
+        for row in rows:
+            row["total"] = sum(row.get(p, 0.0) for p in PHASES)
+        self.summary = {
+            "type": "summary",
+            "label": self.label,
+            "file": str(self.store_path),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started or time.time())),
+            "mode": self.mode,
+            "outcome": outcome,
+            "detail": detail,
+            "items_done": done,
+            "elapsed_s": round(elapsed, 3),
+            "items_per_min": round(done / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "phases": summarize(rows),
+            "histogram": {p: histogram([r.get(p, 0.0) for r in rows]) for p in PHASES},
+        }
+        try:
+            self._write(rows)
+        except OSError:
+            pass  # métricas nunca derrubam uma execução
+        return self.summary
+
+    def _write(self, rows):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        started = self.started or time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started)) + f"{int(started % 1 * 1000):03d}"
+        base = f"{self.store_path.stem}_{stamp}"
+        with (self.dir / (base + ".jsonl")).open("w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps({"type": "item", **_rounded(row)}, ensure_ascii=False) + "\n")
+            f.write(json.dumps(self.summary, ensure_ascii=False) + "\n")
+        with (self.dir / (base + ".csv")).open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["idx", "item", *PHASES, "total"])
+            for row in rows:
+                writer.writerow([row["idx"] + 1, row["item"], *(f"{row.get(p, 0.0):.4f}" for p in (*PHASES, "total"))])
+
+
+def _rounded(row):
+    return {k: (round(v, 4) if isinstance(v, float) else v) for k, v in row.items()}
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return values[k]
+
+
+def summarize(rows):
+    """Média, mediana, p95 e máximo (s) de cada fase."""
+    out = {}
+    for phase in (*PHASES, "total"):
+        values = [r[phase] for r in rows if phase in r]
+        if not values:
+            continue
+        out[phase] = {
+            "mean": round(statistics.fmean(values), 4),
+            "p50": round(_percentile(values, 0.5), 4),
+            "p95": round(_percentile(values, 0.95), 4),
+            "max": round(max(values), 4),
+        }
+    return out
+
+
+def histogram(values, edges_ms=HISTOGRAM_EDGES_MS):
+    """Contagem por faixa de tempo: {"<25ms": n, ..., ">=3200ms": n} (valores zero são ignorados)."""
+    labels = [f"<{e}ms" for e in edges_ms] + [f">={edges_ms[-1]}ms"]
+    counts = dict.fromkeys(labels, 0)
+    for v in values:
+        if v <= 0:
+            continue
+        ms = v * 1000
+        for e, label in zip(edges_ms, labels):
+            if ms < e:
+                counts[label] += 1
+                break
+        else:
+            counts[labels[-1]] += 1
+    return counts
+
+
+def recent_summaries(store_path=None, limit=20, metrics_dir=None):
+    """Resumos das execuções mais recentes (opcionalmente só de uma sub-aba), do mais novo ao mais antigo."""
+    folder = Path(metrics_dir or METRICS_DIR)
+    if not folder.exists():
+        return []
+    pattern = f"{Path(store_path).stem}_*.jsonl" if store_path else "*.jsonl"
+    out = []
+    for path in sorted(folder.glob(pattern), reverse=True)[:limit]:
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                last = None
+                for line in f:
+                    last = line
+            if last:
+                summary = json.loads(last)
+                if summary.get("type") != "summary":
+                    continue
+                if store_path and summary.get("file") != str(Path(store_path)):
+                    continue
+                out.append(summary)
+        except (OSError, ValueError):
+            continue
+    return out
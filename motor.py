@@ -0,0 +1,1017 @@
+# motor.py
+"""
+motor.py
+Motor de digitação headless (sem Tk).
+- TypingEngine percorre os itens (codigo, nome, quantidade, timer) e envia as teclas via pyautogui
+- Usado pelo AutoTyperApp e pela linha de comando: python -m digitador run --category ... --tab ...
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from armazenamento import (
+    CONFIG_FILE, as_item, code_conflicts, ensure_default_config, find_subtab, item_errors, load_config, nav_template,
+    open_store, parse_number, paste_fields, resolve_tab_file, save_config
+)
+from diario import RunJournal, items_hash
+from metricas import RunMetrics
+
+pyautogui = None  # importado só na primeira digitação, ver load_pyautogui()
+pyperclip = None  # área de transferência, só para sub-abas que colam (ver load_clipboard())
+keyboard = None  # atalhos globais opcionais (ver install_hotkeys())
+
+
+def load_pyautogui():
+    """Importa o pyautogui sob demanda (import pesado, e falha sem tela). Retorna None se indisponível."""
+    global pyautogui
+    if pyautogui is None:
+        try:
+            import pyautogui as _pyautogui
+        except Exception:
+            return None
+        pyautogui = _pyautogui
+    return pyautogui
+
+
+def load_clipboard():
+    """Importa o pyperclip sob demanda e confere se a área de transferência responde. Retorna None se não."""
+    global pyperclip
+    if pyperclip is None:
+        try:
+            import pyperclip as _pyperclip
+            _pyperclip.paste()
+        except Exception:
+            return None
+        pyperclip = _pyperclip
+    return pyperclip
+
+
+def load_keyboard():
+    """Importa o pacote keyboard (atalhos globais) sob demanda. Retorna None se indisponível."""
+    global keyboard
+    if keyboard is None:
+        try:
+            import keyboard as _keyboard
+        except Exception:
+            return None
+        keyboard = _keyboard
+    return keyboard
+
+
+PASTE_KEYS = ("command", "v") if sys.platform == "darwin" else ("ctrl", "v")
+PYAUTOGUI_PAUSE = 0.1  # pyautogui.PAUSE padrão, pago por chamada no modo normal
+
+
+class Pacing:
+    """Atrasos (s) usados entre as teclas de cada item.
+
+    Os valores padrão reproduzem o comportamento original (chamadas separadas ao pyautogui, cada uma
+    pagando também o pyautogui.PAUSE global). Com batched=True o item é emitido como uma única
+    sequência de teclas com _pause=False, e só os atrasos explícitos abaixo são aplicados.
+    """
+    def __init__(self, char=0.0, after_code=0.06, after_enter=0.08, after_right=0.04,
+                 after_down=0.5, between_items=0.18, batched=False):
+        self.char = char
+        self.after_code = after_code
+        self.after_enter = after_enter
+        self.after_right = after_right
+        self.after_down = after_down
+        self.between_items = between_items
+        self.batched = batched
+
+    @classmethod
+    def fast(cls):
+        """Modo rápido: sequência única por item, sem o PAUSE oculto do pyautogui."""
+        return cls(char=0.01, after_code=0.03, after_enter=0.05, after_right=0.02,
+                   after_down=0.2, between_items=0.05, batched=True)
+
+
+# ------------------ Modelo de navegação ------------------
+
+# caminho original: código → ENTER → RIGHT×4 → ENTER → quantidade → (tempo do item) → DOWN
+DEFAULT_TEMPLATE = "{codigo} enter right*4 enter {quantidade} {timer} down"
+TEMPLATE_FIELDS = ("codigo", "nome", "quantidade")
+KEY_DELAYS = {"enter": "after_enter", "down": "after_down"}  # atraso (atributo de Pacing); demais teclas: after_right
+MAX_REPEAT = 50
+
+
+def parse_template(text=None):
+    """Converte o modelo de navegação da sub-aba em passos [("field", campo) | ("key", tecla) |
+    ("wait", s) | ("timer", None)].
+
+    Tokens separados por espaço: {codigo}, {quantidade}, {nome} (campos do item), {timer} (onde o tempo
+    do item é esperado; sem ele, no fim), uma tecla ("enter", "tab", "f2"...), tecla*N (N vezes) e
+    wait:S (espera fixa em segundos). Combinações ("ctrl+s") não são aceitas. Os nomes das teclas só são
+    conferidos com o pyautogui já carregado (load_pyautogui). Levanta ValueError dizendo o que está errado.
+    """
+    steps, seen = [], set()
+    for token in (text or DEFAULT_TEMPLATE).split():
+        low = token.lower()
+        if low.startswith("{") and low.endswith("}"):
+            name = low[1:-1]
+            if "+" in name:
+                raise ValueError(f"combinação de teclas não suportada: {token} (use uma tecla por token)")
+            if name not in TEMPLATE_FIELDS and name != "timer":
+                raise ValueError(f"campo desconhecido: {token}")
+            if name in seen:
+                raise ValueError(f"{token} aparece mais de uma vez")
+            seen.add(name)
+            steps.append(("timer", None) if name == "timer" else ("field", name))
+        elif low.startswith(("wait:", "espera:")):
+            try:
+                seconds = parse_number(low.partition(":")[2], dot_thousands=False)
+            except ValueError:
+                raise ValueError(f"espera inválida: {token}")
+            if not 0 <= seconds < 3600:
+                raise ValueError(f"espera inválida: {token}")
+            steps.append(("wait", seconds))
+        else:
+            key, star, count = low.partition("*")
+            repeat = 1
+            if star:
+                if not count.isdigit() or not 1 <= int(count) <= MAX_REPEAT:
+                    raise ValueError(f"repetição inválida: {token} (use tecla*N, N de 1 a {MAX_REPEAT})")
+                repeat = int(count)
+            if "+" in key.strip("+"):
+                raise ValueError(f"combinação de teclas não suportada: {token} (use uma tecla por token)")
+            if not key or "{" in key or (pyautogui is not None and not pyautogui.isValidKey(key)):
+                raise ValueError(f"tecla desconhecida: {token}")
+            steps.extend(("key", key) for _ in range(repeat))
+    if "codigo" not in seen:
+        raise ValueError("o modelo precisa ter {codigo}")
+    if "timer" not in seen:
+        steps.append(("timer", None))
+    return steps
+
+
+# ------------------ Plano de teclas compilado ------------------
+
+# operações do plano: (tipo, argumento, paga_PAUSE)
+OP_BEGIN = "begin"   # início do item (arg = índice)
+OP_TYPE = "type"     # typewrite de um texto
+OP_KEY = "key"       # press de uma tecla (nome do pyautogui)
+OP_CHAR = "char"     # press de um caractere de campo (modo rápido); conferido como texto, não como nome de tecla
+OP_WAIT = "wait"     # atraso fixo (s)
+OP_HOLD = "hold"     # espera do modelo (wait:S), interrompível por Parar/Pausar
+OP_TIMER = "timer"   # timer do item (s), interrompível e com contagem regressiva
+OP_END = "end"       # item concluído (arg = índice)
+OP_PHASE = "phase"   # marcador de fase para as métricas (arg = nome da fase; não custa nada)
+OP_PASTE = "paste"   # texto colado pela área de transferência num só atalho (arg = texto)
+
+
+class Plan:
+    """Sequência explícita de operações de uma execução, compilada antes de começar.
+
+    O motor só percorre ops; nada é formatado ou decidido por tecla durante a digitação.
+    A duração estimada (duration / item_seconds) soma atrasos, timers e o PAUSE do pyautogui
+    das operações que o pagam.
+    """
+    def __init__(self, items, ops, start_at=0):
+        self.items = items
+        self.ops = ops
+        self.start_at = start_at
+        self.item_seconds = {}
+        current = None
+        for kind, arg, paused in ops:
+            if kind == OP_BEGIN:
+                current = arg
+                self.item_seconds[current] = 0.0
+            elif current is not None:
+                self.item_seconds[current] += op_seconds(kind, arg, paused)
+        self.duration = sum(self.item_seconds.values())
+
+    def __len__(self):
+        return len(self.items) - self.start_at
+
+    def check(self):
+        """Problemas encontrados no plano (lista vazia = ok). Valida as teclas com o pyautogui, se disponível."""
+        problems = []
+        valid_key = pyautogui.isValidKey if pyautogui is not None else (lambda k: bool(k))
+        for n, (kind, arg, _) in enumerate(self.ops):
+            if kind == OP_KEY and not valid_key(arg):
+                problems.append(f"op {n}: tecla desconhecida '{arg}'")
+            elif kind in (OP_TYPE, OP_CHAR) and any(not ch.isprintable() for ch in arg):
+                problems.append(f"op {n}: texto com caractere de controle {arg!r}")
+            elif kind in (OP_WAIT, OP_HOLD, OP_TIMER) and arg < 0:
+                problems.append(f"op {n}: espera negativa {arg}")
+        return problems
+
+    def to_text(self):
+        """Dry run legível: uma linha por operação, com o tempo acumulado estimado."""
+        lines = [f"# {len(self)} itens, {len(self.ops)} operações, duração estimada "
+                 f"{format_eta(self.duration)} ({self.duration:.2f}s)"]
+        clock = 0.0
+        for kind, arg, paused in self.ops:
+            if kind == OP_BEGIN:
+                it = self.items[arg]
+                lines.append(f"[{clock:9.2f}s] item {arg+1}: {it.codigo} (Qtd: {it.qtd})")
+            elif kind not in (OP_END, OP_PHASE):
+                extra = " +PAUSE" if paused else ""
+                lines.append(f"    {kind:5s} {arg!r}{extra}")
+            clock += op_seconds(kind, arg, paused)
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        return {
+            "items": len(self),
+            "duration": round(self.duration, 3),
+            "ops": [[kind, arg, paused] for kind, arg, paused in self.ops],
+        }
+
+
+def op_seconds(kind, arg, paused):
+    if kind in (OP_WAIT, OP_HOLD, OP_TIMER):
+        return arg
+    if kind in (OP_KEY, OP_CHAR, OP_TYPE, OP_PASTE) and paused:
+        return PYAUTOGUI_PAUSE
+    return 0.0
+
+
+def compile_plan(items, pacing=None, start_at=0, paste=(), template=None):
+    """Compila os itens (a partir de start_at) no plano de operações, seguindo o modelo de navegação
+    da sub-aba (template, ver parse_template; padrão: o caminho original).
+
+    paste: campos ("codigo", "quantidade") colados com um único Ctrl+V em vez de digitados.
+    """
+    pacing = pacing or Pacing()
+    steps = parse_template(template)
+    items = [as_item(it) for it in items]
+    batched = pacing.batched
+    ops = []
+    add = ops.append
+    for idx in range(start_at, len(items)):
+        item = items[idx]
+        t = item.timer if not item.error else 0.0
+        values = {"codigo": item.codigo, "nome": item.nome, "quantidade": item.qtd}
+        add((OP_BEGIN, idx, False))
+        add((OP_PHASE, "codigo", False))
+        phase = "codigo"
+        for kind, arg in steps:
+            if kind == "timer":
+                if t > 0:
+                    phase = "timer"
+                    add((OP_PHASE, "timer", False))
+                    add((OP_TIMER, t, False))
+                continue
+            # fases das métricas: teclas depois do código = navegação; depois da quantidade/tempo = intervalo
+            if kind == "field":
+                new_phase = arg if arg in ("codigo", "quantidade") else phase
+            else:
+                new_phase = {"codigo": "navegacao", "quantidade": "intervalo", "timer": "intervalo"}.get(phase, phase)
+            if new_phase != phase:
+                phase = new_phase
+                add((OP_PHASE, phase, False))
+            if kind == "wait":
+                # escrita pelo usuário e pode ser longa: não é um sleep simples como os atrasos do ritmo
+                add((OP_HOLD, arg, False))
+            elif kind == "key":
+                add((OP_KEY, arg, not batched))
+                add((OP_WAIT, getattr(pacing, KEY_DELAYS.get(arg, "after_right")), False))
+            else:
+                text = values[arg]
+                if not text:
+                    continue
+                pasted = arg in paste
+                last_delay = pacing.after_code if arg == "codigo" else (pacing.char if batched else 0.0)
+                if not batched:
+                    # uma chamada ao pyautogui por campo (paga o PAUSE)
+                    add((OP_PASTE if pasted else OP_TYPE, text, True))
+                elif pasted:
+                    add((OP_PASTE, text, False))
+                else:
+                    # modo rápido: cada caractere é uma tecla com o próprio atraso
+                    for ch in text[:-1]:
+                        add((OP_CHAR, ch, False))
+                        add((OP_WAIT, pacing.char, False))
+                    add((OP_CHAR, text[-1], False))
+                add((OP_WAIT, last_delay, False))
+        add((OP_END, idx, False))
+        add((OP_WAIT, pacing.between_items, False))
+    # zeros não custam nada: tira do plano
+    ops = [op for op in ops if not (op[0] in (OP_WAIT, OP_HOLD) and op[1] <= 0)]
+    return Plan(items, ops, start_at)
+
+
+# ------------------ Parar / pausar ------------------
+
+PAUSE_HOTKEY = "ctrl+alt+p"  # atalhos globais (com o pacote keyboard): pausa/continua e para
+STOP_HOTKEY = "ctrl+alt+s"
+
+
+class RunControl:
+    """Parar e pausar uma execução, de qualquer thread.
+
+    Para o "parar" tem a interface do threading.Event (set/is_set/clear/wait), então serve onde o motor
+    recebe stop_event. wait(s) espera s segundos contados no relógio monotônico e acorda na hora ao parar;
+    enquanto pausado o relógio não anda, e o que faltava da espera continua depois de resume().
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._paused_since = None
+        self._paused_total = 0.0
+
+    def set(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def is_set(self):
+        return self._stopped
+
+    def clear(self):
+        with self._cond:
+            self._stopped = False
+
+    def reset(self):
+        """Pronto para uma execução nova: nem parado nem pausado."""
+        with self._cond:
+            self._stopped = False
+            self._paused_since = None
+            self._cond.notify_all()
+
+    @property
+    def paused(self):
+        return self._paused_since is not None
+
+    def pause(self):
+        with self._cond:
+            if self._paused_since is None:
+                self._paused_since = time.monotonic()
+                self._cond.notify_all()
+
+    def resume(self):
+        with self._cond:
+            if self._paused_since is not None:
+                self._paused_total += time.monotonic() - self._paused_since
+                self._paused_since = None
+                self._cond.notify_all()
+
+    def toggle_pause(self):
+        """Pausa ou continua; retorna True se ficou pausado."""
+        with self._cond:
+            if self._paused_since is None:
+                self.pause()
+            else:
+                self.resume()
+            return self._paused_since is not None
+
+    def paused_time(self):
+        """Total de segundos passados em pausa (inclui a pausa em andamento)."""
+        with self._cond:
+            total = self._paused_total
+            if self._paused_since is not None:
+                total += time.monotonic() - self._paused_since
+            return total
+
+    def wait(self, timeout=None):
+        """Espera timeout segundos fora de pausa (None = até parar); wait(0) só segura enquanto pausado.
+        Retorna True se foi parado."""
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._stopped:
+                if self._paused_since is not None:
+                    since = self._paused_since
+                    self._cond.wait()
+                    if deadline is not None:
+                        # a pausa não conta: empurra o prazo pelo tempo parado
+                        deadline += (self._paused_since or time.monotonic()) - since
+                    continue
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            return self._stopped
+
+
+def install_hotkeys(control):
+    """Registra PAUSE_HOTKEY (pausa/continua) e STOP_HOTKEY (para) para control, globais no sistema.
+    Retorna a função que os remove, ou None se o pacote keyboard não estiver disponível."""
+    kb = load_keyboard()
+    if kb is None:
+        return None
+    try:
+        handles = [kb.add_hotkey(PAUSE_HOTKEY, control.toggle_pause), kb.add_hotkey(STOP_HOTKEY, control.set)]
+    except Exception:
+        # ex.: Linux sem permissão para ler o teclado
+        return None
+
+    def remove():
+        for handle in handles:
+            try:
+                kb.remove_hotkey(handle)
+            except Exception:
+                pass
+    return remove
+
+# ------------------ Eventos de progresso ------------------
+
+class ProgressEvent(namedtuple("ProgressEvent", "kind idx total codigo qtd remaining outcome message")):
+    """Evento estruturado publicado pelo motor.
+
+    kind: "item_started", "item_done", "item_failed", "countdown" (remaining = segundos restantes,
+    0 quando a espera termina), "paused"/"resumed" (pausa antes do item idx) ou "run_finished"
+    (outcome = "done", "stopped", "failsafe", "invalid" ou "error"). message traz o detalhe de falhas/erros.
+
+    Na fila de listas (QueueRunner) também: "list_started"/"list_finished" (idx/total = posição da
+    lista, message = nome) e "queue_progress" (idx/total = itens concluídos/total, remaining = ETA em s).
+    """
+    __slots__ = ()
+
+
+def make_event(kind, idx=-1, total=0, codigo="", qtd="", remaining=0.0, outcome="", message=""):
+    return ProgressEvent(kind, idx, total, codigo, qtd, remaining, outcome, message)
+
+
+RUN_MESSAGES = {
+    "done": "✅ Concluído com sucesso.",
+    "stopped": "Parado pelo usuário.",
+    "failsafe": "Abortado: Fail-safe acionado (mova o mouse para um canto).",
+}
+
+
+def format_event(ev):
+    """Texto de status para um evento (o mesmo na janela e na linha de comando)."""
+    head = f"[{ev.idx+1}/{ev.total}] Digitando: {ev.codigo} (Qtd: {ev.qtd})"
+    if ev.kind == "item_started":
+        return head
+    if ev.kind == "countdown":
+        return f"{head} | Aguardando: {ev.remaining}s" if ev.remaining > 0 else head
+    if ev.kind == "item_done":
+        return f"[{ev.idx+1}/{ev.total}] Concluído: {ev.codigo}"
+    if ev.kind == "item_failed":
+        return f"[{ev.idx+1}/{ev.total}] Falhou: {ev.codigo}"
+    if ev.kind == "paused":
+        return f"⏸ Pausado antes do item {ev.idx+1}/{ev.total} ({ev.codigo})"
+    if ev.kind == "resumed":
+        return f"[{ev.idx+1}/{ev.total}] Continuando: {ev.codigo}"
+    if ev.kind == "run_finished":
+        return RUN_MESSAGES.get(ev.outcome, ev.message)
+    if ev.kind == "list_started":
+        return f"Lista {ev.idx+1}/{ev.total}: {ev.message}"
+    if ev.kind == "queue_progress":
+        return f"{ev.message} — {ev.idx}/{ev.total} itens — ETA {format_eta(ev.remaining)}"
+    return ""
+
+
+def format_eta(seconds):
+    seconds = max(0, int(round(seconds)))
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+class ProgressBus:
+    """Canal thread-safe entre a thread do motor e o mainloop do Tk.
+
+    O motor chama publish() (não toca em widgets); a interface chama drain() num intervalo fixo.
+    drain() descarta contagens regressivas superadas por eventos posteriores, então só o estado
+    mais recente da espera é desenhado, mas nenhum início/fim de item se perde.
+    """
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def publish(self, event):
+        self._queue.put(event)
+
+    def drain(self):
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        last = len(events) - 1
+        return [ev for i, ev in enumerate(events) if ev.kind != "countdown" or i == last]
+
+
+class TypingEngine:
+    """Executa a sequência de teclas de cada item, publicando ProgressEvent em on_event
+    (chamado na thread que executa run(); use ProgressBus.publish para levar à interface)."""
+    def __init__(self, stop_event=None, start_delay=4.0, pacing=None, on_event=None, journal=None, metrics=None,
+                 paste=(), template=None):
+        # threading.Event também serve (sem pausa). O motor só lê o sinal: quem criou limpa (reset/clear)
+        # antes de reutilizar, senão uma fila veria "parado" apagado no fim de cada lista
+        self.stop_event = stop_event or RunControl()
+        self.start_delay = start_delay
+        self.pacing = pacing or Pacing()
+        self.paste = paste  # campos colados em vez de digitados (usado por run(); ver compile_plan)
+        self.template = template  # modelo de navegação da sub-aba (usado por run(); ver parse_template)
+        self.on_event = on_event or (lambda ev: None)
+        self.journal = journal  # RunJournal opcional: registra cada item concluído
+        self.metrics = metrics  # RunMetrics opcional: tempos por fase de cada item
+        self._done = 0
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _pause_point(self, idx, total):
+        # fronteira entre itens: segura aqui enquanto pausado. True se foi parado
+        control = self.stop_event
+        if not getattr(control, "paused", False):
+            return control.is_set()
+        codigo, qtd = self._items[idx].codigo, self._items[idx].qtd
+        self.on_event(make_event("paused", idx, total, codigo, qtd))
+        if control.wait(0):
+            return True
+        self.on_event(make_event("resumed", idx, total, codigo, qtd))
+        return False
+
+    def _countdown(self, seconds, on_tick, tick=0.1):
+        """Espera seconds contra um prazo no relógio monotônico (o atraso de cada tick não se acumula),
+        chamando on_tick(restante) a cada tick. Acorda na hora ao parar; tempo pausado estende o prazo.
+        Retorna True se foi parado."""
+        control = self.stop_event
+        paused_time = getattr(control, "paused_time", lambda: 0.0)
+        deadline = time.monotonic() + seconds
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return control.is_set()
+            on_tick(left)
+            before = paused_time()
+            if control.wait(min(tick, left)):
+                return True
+            deadline += paused_time() - before
+
+    def _finish(self, outcome, detail=""):
+        if self.journal is not None and self.journal.run_id is not None:
+            self.journal.end(outcome)
+        if self.metrics is not None and self.metrics.t0 is not None:
+            self.metrics.finish(outcome, detail, done=self._done)
+        self.on_event(make_event("run_finished", outcome=outcome, message=detail))
+        return outcome
+
+    def run(self, items, start_at=0):
+        """Compila e digita os itens a partir de start_at (0-based). Retorna "done", "stopped",
+        "failsafe", "invalid" ou "error"."""
+        if load_pyautogui() is None:
+            raise RuntimeError("pyautogui não está instalado. Rode: pip install pyautogui")
+        # tudo já normalizado antes de começar: nenhum parse dentro do laço de digitação
+        items = [as_item(it) for it in items]
+        errors = item_errors(items)
+        if errors:
+            idx, msg = errors[0]
+            return self._finish("invalid", f"{len(errors)} linha(s) inválida(s); primeira: linha {idx+1} ({items[idx].codigo}): {msg}")
+        return self.run_plan(compile_plan(items, self.pacing, start_at, self.paste, self.template))
+
+    def run_plan(self, plan):
+        """Executa um plano já compilado."""
+        if load_pyautogui() is None:
+            raise RuntimeError("pyautogui não está instalado. Rode: pip install pyautogui")
+        problems = plan.check()
+        if problems:
+            return self._finish("invalid", f"Plano inválido: {problems[0]}")
+        items = self._items = plan.items
+        total = len(items)
+        emit = self.on_event
+        # Delay pra dar tempo de foco (Parar interrompe na hora, antes de mexer no diário)
+        if self.stop_event.wait(self.start_delay):
+            return self._finish("stopped")
+        if self.journal is not None:
+            self.journal.begin(items_hash(items), total, plan.start_at)
+        pyautogui.FAILSAFE = True
+        press, typewrite, hotkey, sleep = pyautogui.press, pyautogui.typewrite, pyautogui.hotkey, time.sleep
+        # colar: guarda o conteúdo atual da área de transferência para devolver no fim;
+        # sem área de transferência disponível, os trechos colados são digitados
+        clip, saved_clip = None, None
+        if any(kind == OP_PASTE for kind, _, _ in plan.ops):
+            clip = load_clipboard()
+            if clip is not None:
+                try:
+                    saved_clip = clip.paste()
+                except Exception:
+                    clip = None
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start("rapido" if self.pacing.batched else "normal")
+        self._done = 0
+        idx, codigo, qtd = -1, "", ""
+        try:
+            for kind, arg, paused in plan.ops:
+                if kind in (OP_KEY, OP_CHAR):
+                    press(arg, _pause=paused)
+                elif kind == OP_WAIT:
+                    sleep(arg)
+                elif kind == OP_TYPE:
+                    typewrite(arg, _pause=paused)
+                elif kind == OP_PASTE:
+                    if clip is not None:
+                        try:
+                            clip.copy(arg)
+                        except Exception:
+                            clip = None
+                    if clip is not None:
+                        hotkey(*PASTE_KEYS, _pause=paused)
+                    else:
+                        typewrite(arg, _pause=paused)
+                elif kind == OP_PHASE:
+                    if metrics is not None:
+                        metrics.mark(idx, codigo, arg)
+                elif kind == OP_BEGIN:
+                    if self._pause_point(arg, total):
+                        return self._finish("stopped")
+                    idx = arg
+                    codigo, qtd = items[idx].codigo, items[idx].qtd
+                    emit(make_event("item_started", idx, total, codigo, qtd))
+                elif kind == OP_HOLD:
+                    if self.stop_event.wait(arg):
+                        return self._finish("stopped")
+                elif kind == OP_TIMER:
+                    stopped = self._countdown(
+                        arg, lambda left: emit(make_event("countdown", idx, total, codigo, qtd, round(left, 1))))
+                    emit(make_event("countdown", idx, total, codigo, qtd, 0.0))
+                    if stopped:
+                        return self._finish("stopped")
+                elif kind == OP_END:
+                    self._done += 1
+                    if self.journal is not None:
+                        self.journal.item_done(idx, codigo)
+                    emit(make_event("item_done", idx, total, codigo, qtd))
+
+            # Parar no meio das teclas do último item só é visto aqui
+            return self._finish("stopped" if self.stop_event.is_set() else "done")
+        except pyautogui.FailSafeException:
+            emit(make_event("item_failed", idx, total, codigo, qtd, message="failsafe"))
+            return self._finish("failsafe")
+        except Exception as e:
+            emit(make_event("item_failed", idx, total, codigo, qtd, message=str(e)))
+            return self._finish("error", f"Erro durante execução: {e}")
+        finally:
+            if clip is not None and saved_clip is not None:
+                try:
+                    clip.copy(saved_clip)
+                except Exception:
+                    pass
+
+# ------------------ Fila de listas ------------------
+
+def parse_between_actions(text):
+    """Ações entre listas, separadas por ponto e vírgula: "wait 3" (ou "espera 1,5"), "enter", "ctrl+s".
+    Retorna [("wait", segundos) | ("keys", [teclas])]; levanta ValueError se algo não fizer sentido."""
+    actions = []
+    for part in (text or "").split(";"):
+        part = part.strip().lower()
+        if not part:
+            continue
+        word, _, arg = part.partition(" ")
+        if word in ("wait", "espera"):
+            seconds = parse_number(arg, dot_thousands=False)
+            if seconds < 0:
+                raise ValueError(f"espera negativa: '{part}'")
+            actions.append(("wait", seconds))
+        elif " " in part:
+            raise ValueError(f"ação desconhecida: '{part}'")
+        else:
+            actions.append(("keys", part.split("+")))
+    return actions
+
+
+class QueueEntry:
+    """Uma lista da fila: nome para exibição, itens, e diário/métricas opcionais da sub-aba."""
+    def __init__(self, label, items, journal=None, start_at=0, metrics=None, paste=(), template=None):
+        self.label = label
+        self.items = [as_item(it) for it in items]
+        self.journal = journal
+        self.start_at = start_at
+        self.metrics = metrics
+        self.paste = paste
+        self.template = template
+
+
+class QueueRunner:
+    """Digita várias listas seguidas numa sessão só (um único atraso inicial), executando as
+    ações entre listas e publicando o progresso geral com ETA."""
+    def __init__(self, entries, between=(), stop_event=None, start_delay=4.0, pacing=None, on_event=None):
+        self.entries = list(entries)
+        self.between = list(between)
+        self.stop_event = stop_event or RunControl()
+        self.start_delay = start_delay
+        self.pacing = pacing or Pacing()
+        self.on_event = on_event or (lambda ev: None)
+        # planos compilados já aqui: a duração total é conhecida antes de começar
+        self.plans = [compile_plan(e.items, self.pacing, e.start_at, e.paste, e.template) for e in self.entries]
+        between_wait = sum(arg for kind, arg in self.between if kind == "wait")
+        self.duration = sum(p.duration for p in self.plans) + between_wait * max(0, len(self.entries) - 1)
+
+    def run(self):
+        """Retorna o resultado da última lista executada ("done" se todas terminaram)."""
+        if load_pyautogui() is None:
+            raise RuntimeError("pyautogui não está instalado. Rode: pip install pyautogui")
+        return self._run()
+
+    def _run(self):
+        for _, keys in (a for a in self.between if a[0] == "keys"):
+            bad = [k for k in keys if not pyautogui.isValidKey(k)]
+            if bad:
+                return self._finish("invalid", f"Tecla inválida nas ações entre listas: {', '.join(bad)}")
+        for entry in self.entries:
+            errors = item_errors(entry.items)
+            if errors:
+                return self._finish("invalid", f"{entry.label}: {len(errors)} linha(s) inválida(s)")
+
+        expected_left = self.duration
+        total_items = sum(len(p) for p in self.plans)
+        state = {"done": 0, "expected_done": 0.0, "t0": None, "detail": ""}
+        n_lists = len(self.entries)
+
+        if self.stop_event.wait(self.start_delay):
+            return self._finish("stopped")
+        state["t0"] = time.monotonic()
+
+        for n, entry in enumerate(self.entries):
+            if self.stop_event.is_set():
+                return self._finish("stopped")
+            self.on_event(make_event("list_started", n, n_lists, message=entry.label))
+
+            plan = self.plans[n]
+
+            def relay(ev, entry=entry, plan=plan):
+                if ev.kind == "run_finished":
+                    state["detail"] = ev.message
+                    self.on_event(make_event("list_finished", n, n_lists, outcome=ev.outcome, message=entry.label))
+                    return
+                self.on_event(ev)
+                if ev.kind == "item_done":
+                    state["done"] += 1
+                    state["expected_done"] += plan.item_seconds[ev.idx]
+                    left = expected_left - state["expected_done"]
+                    # corrige a estimativa pela velocidade real observada até aqui
+                    elapsed = time.monotonic() - state["t0"]
+                    if state["expected_done"] > 0:
+                        left *= elapsed / state["expected_done"]
+                    self.on_event(make_event("queue_progress", state["done"], total_items, remaining=left, message=entry.label))
+
+            engine = TypingEngine(stop_event=self.stop_event, start_delay=0, pacing=self.pacing,
+                                  on_event=relay, journal=entry.journal, metrics=entry.metrics)
+            outcome = engine.run_plan(plan)
+            if outcome != "done":
+                detail = RUN_MESSAGES.get(outcome, state["detail"])
+                return self._finish(outcome, f"{entry.label}: {detail}")
+            if self.stop_event.is_set():
+                return self._finish("stopped", f"{entry.label}: {RUN_MESSAGES['stopped']}")
+            if n < n_lists - 1:
+                outcome = self._between_lists()
+                if outcome != "done":
+                    return self._finish(outcome)
+        return self._finish("done")
+
+    def _between_lists(self):
+        try:
+            for kind, arg in self.between:
+                if kind == "wait":
+                    if self.stop_event.wait(arg):
+                        break
+                elif len(arg) == 1:
+                    pyautogui.press(arg[0], _pause=False)
+                    time.sleep(self.pacing.after_enter)
+                else:
+                    pyautogui.hotkey(*arg, _pause=False)
+                    time.sleep(self.pacing.after_enter)
+                if self.stop_event.is_set():
+                    break
+        except pyautogui.FailSafeException:
+            return "failsafe"
+        return "stopped" if self.stop_event.is_set() else "done"
+
+    def _finish(self, outcome, detail=""):
+        self.on_event(make_event("run_finished", outcome=outcome, message=detail))
+        return outcome
+
+# ------------------ Linha de comando ------------------
+
+def _build_parser():
+    parser = argparse.ArgumentParser(prog="python -m digitador", description="Digitador de Ordem (modo sem interface).")
+    parser.add_argument("--config", default=str(CONFIG_FILE), help="caminho do config_abas.json")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def typing_options(p):
+        p.add_argument("--delay", type=float, default=4.0, help="segundos antes de começar (tempo para focar o campo alvo)")
+        p.add_argument("--fast", action="store_true", help="modo rápido: cada item em uma única sequência de teclas")
+
+    run = sub.add_parser("run", help="digita a lista de uma sub-aba sem abrir a janela")
+    run.add_argument("--category", required=True, help="nome da categoria em config_abas.json")
+    run.add_argument("--tab", required=True, help="nome da sub-aba dentro da categoria")
+    typing_options(run)
+    start = run.add_mutually_exclusive_group()
+    start.add_argument("--resume", action="store_true", help="retoma do item seguinte ao último concluído (diário da sub-aba)")
+    start.add_argument("--from", dest="start_from", type=int, metavar="N", help="começa no item N (1 = primeiro)")
+
+    plano = sub.add_parser("plan", help="dry run: compila e mostra o plano de teclas e a duração estimada")
+    plano.add_argument("--category", required=True, help="nome da categoria em config_abas.json")
+    plano.add_argument("--tab", required=True, help="nome da sub-aba dentro da categoria")
+    plano.add_argument("--fast", action="store_true", help="compila para o modo rápido")
+    plano.add_argument("--from", dest="start_from", type=int, metavar="N", default=1, help="começa no item N (1 = primeiro)")
+    plano.add_argument("--json", action="store_true", help="exporta em JSON em vez de texto")
+    plano.add_argument("--out", help="grava o plano neste arquivo em vez de mostrar na tela")
+
+    fila = sub.add_parser("queue", help="digita várias sub-abas em sequência numa sessão só")
+    fila.add_argument("lists", nargs="+", metavar="CATEGORIA/SUBABA", help="sub-abas na ordem de execução")
+    fila.add_argument("--between", default="wait 3", help='ações entre listas, ex.: "wait 3; ctrl+s; enter"')
+    typing_options(fila)
+
+    migrar = sub.add_parser("migrate", help="copia as sub-abas em JSON para o banco SQLite (uma vez)")
+    migrar.add_argument("--db", help="arquivo do banco (padrão: data/digitador.db)")
+
+    importar = sub.add_parser("import", help="importa planilhas em lote: cada arquivo = categoria, cada aba = sub-aba")
+    importar.add_argument("paths", nargs="+", metavar="CAMINHO", help="planilhas .xlsx/.xls ou pastas com elas")
+    importar.add_argument("--category", help="põe todas as abas nesta categoria (padrão: nome do arquivo)")
+    importar.add_argument("--workers", type=int, help="processos de leitura (padrão: núcleos da CPU)")
+    return parser
+
+
+class _CliError(Exception):
+    def __init__(self, message, code=2):
+        super().__init__(message)
+        self.code = code
+
+
+def _load_store(categories, category, tab):
+    entry = find_subtab(categories, category, tab)
+    if entry is None:
+        raise _CliError(f"Sub-aba '{tab}' não encontrada na categoria '{category}'.")
+    store = open_store(entry)
+    path = store.path
+    if not entry.get("db") and not path.exists():
+        raise _CliError(f"Arquivo da sub-aba não existe: {path}")
+    if not store.data:
+        raise _CliError(f"Lista vazia: {category} / {tab}.", code=1)
+    errors = store.errors()
+    if errors:
+        lines = [f"{category} / {tab} — linha {idx+1} ({store.data[idx].codigo}): {msg}" for idx, msg in errors]
+        raise _CliError("\n".join(lines))
+    try:
+        parse_template(nav_template(entry))
+    except ValueError as e:
+        raise _CliError(f"{category} / {tab} — modelo de navegação inválido: {e}")
+    return entry, path, store
+
+
+def _warn_duplicates(categories, category, tab, store):
+    """Avisa (stderr) sobre códigos repetidos na lista ou em outras sub-abas da mesma categoria."""
+    for codigo, pos in store.duplicates().items():
+        print(f"Aviso: {category} / {tab} — código {codigo} aparece {len(pos)}× (linhas "
+              f"{', '.join(str(i + 1) for i in pos[:5])})", file=sys.stderr)
+    stores = {tab: store}
+    for entry in categories.get(category, []):
+        name = entry.get("name")
+        if name != tab and (entry.get("db") or resolve_tab_file(entry).exists()):
+            stores[name] = open_store(entry)
+    for codigo, names in code_conflicts(stores).items():
+        if tab in names:
+            others = ", ".join(n for n in names if n != tab)
+            print(f"Aviso: {category} / {tab} — código {codigo} também está em {others}", file=sys.stderr)
+
+
+def _print_event(ev):
+    if ev.kind == "countdown":
+        if ev.remaining > 0:
+            print(f"\r  aguardando: {ev.remaining:.1f}s ", end="", flush=True)
+        else:
+            print("\r" + " " * 24 + "\r", end="", flush=True)
+    elif ev.kind not in ("item_done", "list_finished"):
+        print(format_event(ev), flush=True)
+
+
+def _execute(run, delay, control):
+    print(f"Iniciando em {delay:g} segundos... Posicione o cursor no campo alvo.", flush=True)
+    remove_hotkeys = install_hotkeys(control)
+    if remove_hotkeys is not None:
+        print(f"Atalhos: {PAUSE_HOTKEY} pausa/continua, {STOP_HOTKEY} para.", flush=True)
+    try:
+        result = run()
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("\nParado pelo usuário.", flush=True)
+        return 130
+    finally:
+        if remove_hotkeys is not None:
+            remove_hotkeys()
+    return 0 if result == "done" else 1
+
+
+def _cmd_run(args, categories):
+    entry, path, store = _load_store(categories, args.category, args.tab)
+    _warn_duplicates(categories, args.category, args.tab, store)
+    items = store.get_all()
+
+    journal = RunJournal(path)
+    start_at = 0
+    if args.resume:
+        start_at = journal.resume_point(items_hash(items))
+        if start_at is None:
+            raise _CliError("Nenhuma execução interrompida para retomar nesta lista.", code=1)
+        print(f"Retomando do item {start_at+1} ({items[start_at].codigo}).", flush=True)
+    elif args.start_from is not None:
+        if not 1 <= args.start_from <= len(items):
+            raise _CliError(f"--from deve estar entre 1 e {len(items)}.")
+        start_at = args.start_from - 1
+
+    engine = TypingEngine(
+        start_delay=args.delay,
+        pacing=Pacing.fast() if args.fast else Pacing(),
+        on_event=_print_event,
+        journal=journal,
+        metrics=RunMetrics(path, f"{args.category} / {args.tab}"),
+        paste=paste_fields(entry),
+        template=nav_template(entry),
+    )
+    return _execute(lambda: engine.run(items, start_at=start_at), args.delay, engine.stop_event)
+
+
+def _cmd_queue(args, categories):
+    try:
+        between = parse_between_actions(args.between)
+    except ValueError as e:
+        raise _CliError(f"--between inválido: {e}")
+    entries = []
+    for spec in args.lists:
+        category, sep, tab = spec.partition("/")
+        if not sep:
+            raise _CliError(f"Use CATEGORIA/SUBABA: '{spec}'")
+        category, tab = category.strip(), tab.strip()
+        entry, path, store = _load_store(categories, category, tab)
+        _warn_duplicates(categories, category, tab, store)
+        label = f"{category} / {tab}"
+        entries.append(QueueEntry(label, store.get_all(), journal=RunJournal(path), metrics=RunMetrics(path, label),
+                                  paste=paste_fields(entry), template=nav_template(entry)))
+    runner = QueueRunner(entries, between, start_delay=args.delay,
+                         pacing=Pacing.fast() if args.fast else Pacing(), on_event=_print_event)
+    return _execute(runner.run, args.delay, runner.stop_event)
+
+
+def _cmd_plan(args, categories):
+    entry, _, store = _load_store(categories, args.category, args.tab)
+    if not 1 <= args.start_from <= len(store.data):
+        raise _CliError(f"--from deve estar entre 1 e {len(store.data)}.")
+    plan = compile_plan(store.get_all(), Pacing.fast() if args.fast else Pacing(), args.start_from - 1,
+                        paste_fields(entry), nav_template(entry))
+    text = json.dumps(plan.to_json(), ensure_ascii=False, indent=2) if args.json else plan.to_text()
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+        print(f"Plano gravado em {args.out}: {len(plan)} itens, duração estimada {format_eta(plan.duration)}.")
+    else:
+        print(text, end="")
+    problems = plan.check()
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+def _cmd_migrate(args, categories):
+    from banco import DB_FILE, migrate_json
+    migrated, copied, problems = migrate_json(categories, args.db or DB_FILE)
+    if migrated:
+        save_config(categories, args.config)
+    print(f"{migrated} sub-aba(s) migrada(s), {copied} itens copiados. Os arquivos JSON foram mantidos como cópia.")
+    for problem in problems:
+        print(f"Não migrada — {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def _cmd_import(args, categories):
+    from importador import apply_bulk, bulk_jobs, parse_parallel
+    try:
+        jobs = bulk_jobs(args.paths, args.category)
+    except Exception as e:
+        raise _CliError(f"Não foi possível abrir as planilhas: {e}")
+    if not jobs:
+        raise _CliError("Nenhuma planilha encontrada.", code=1)
+    print(f"Lendo {len(jobs)} aba(s)...", flush=True)
+    summary, problems = apply_bulk(categories, parse_parallel(jobs, workers=args.workers))
+    if any(created for _, _, _, created, *_ in summary):
+        save_config(categories, args.config)
+    for category, name, _, created, added, updated, same in summary:
+        print(f"{category} / {name}{' (nova)' if created else ''}: {added} novos, {updated} atualizados, {same} iguais")
+    for problem in problems:
+        print(f"Não importada — {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+COMMANDS = {"run": _cmd_run, "plan": _cmd_plan, "queue": _cmd_queue, "migrate": _cmd_migrate, "import": _cmd_import}
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    ensure_default_config()
+    categories = load_config(args.config)
+    try:
+        return COMMANDS[args.command](args, categories)
+    except _CliError as e:
+        print(str(e), file=sys.stderr)
+        return e.code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
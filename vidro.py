@@ -0,0 +1,69 @@
+# vidro.py
+"""
+vidro.py
+Efeito vidro / acrylic da janela (botão "Fixar").
+- Só existe no Windows (SetWindowCompositionAttribute do user32); nos outros sistemas as funções não fazem nada
+- Importado sob demanda pelo digitador.py, na primeira vez que o botão é usado
+"""
+
+import sys
+
+if sys.platform == "win32":
+    from ctypes import (
+        Structure, sizeof, c_int, c_uint, c_void_p,
+        windll, byref, addressof
+    )
+
+    class ACCENT_POLICY(Structure):
+        _fields_ = [
+            ("AccentState", c_int),
+            ("AccentFlags", c_int),
+            ("GradientColor", c_int),
+            ("AnimationId", c_int)
+        ]
+
+
+    class WINCOMPATTRDATA(Structure):
+        _fields_ = [
+            ("Attribute", c_int),
+            ("Data", c_void_p),
+            ("SizeOfData", c_uint)
+        ]
+
+
+    def enable_acrylic(hwnd):
+        try:
+            accent = ACCENT_POLICY()
+            accent.AccentState = 4  # Acrylic Blur
+            accent.GradientColor = 0x99FFFFFF  # Transparência + cor (ARGB)
+
+            data = WINCOMPATTRDATA()
+            data.Attribute = 19  # WCA_ACCENT_POLICY
+            data.Data = c_void_p(addressof(accent))
+            data.SizeOfData = sizeof(accent)
+
+            windll.user32.SetWindowCompositionAttribute(hwnd, byref(data))
+        except Exception:
+            pass
+
+
+    def disable_acrylic(hwnd):
+        try:
+            accent = ACCENT_POLICY()
+            accent.AccentState = 0  # Desativa
+
+            data = WINCOMPATTRDATA()
+            data.Attribute = 19
+            data.Data = c_void_p(addressof(accent))
+            data.SizeOfData = sizeof(accent)
+
+            windll.user32.SetWindowCompositionAttribute(hwnd, byref(data))
+        except Exception:
+            pass
+
+else:
+    def enable_acrylic(hwnd):
+        pass
+
+    def disable_acrylic(hwnd):
+        pass